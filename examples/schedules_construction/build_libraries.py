@@ -0,0 +1,35 @@
+"""Rebuild the precompiled template libraries of the schedule definitions already in the package
+data, without rebuilding the definitions (create_all does both).
+
+    python -m examples.schedules_construction.build_libraries
+"""
+from __future__ import annotations
+from pathlib import Path
+from flightanalysis.definition.scheddef import SchedDef, ScheduleInfo, schedule_library
+
+
+def build_libraries(sinfos: list[ScheduleInfo]=None) -> dict[str, Path | str]:
+    """Build and save the template library of each schedule.
+
+    Args:
+        sinfos (list[ScheduleInfo], optional): the schedules. Defaults to all in the package data.
+
+    Returns:
+        dict[str, Path | str]: the library file of each schedule, or the error if it could not
+            be loaded
+    """
+    results = {}
+    for sinfo in schedule_library if sinfos is None else sinfos:
+        try:
+            sdef = SchedDef.load(sinfo)
+        except Exception as ex:
+            results[str(sinfo)] = f"{ex.__class__.__name__}: {ex}"
+            continue
+        sdef.build_library(sinfo)
+        results[str(sinfo)] = SchedDef.library_path(sinfo)
+    return results
+
+
+if __name__ == "__main__":
+    for name, res in build_libraries().items():
+        print(f"{name}: {'could not load, ' if isinstance(res, str) else 'built '}{res}")
@@ -1,21 +1,97 @@
-from .f3a_p23 import p23_def
-from .f3a_a25 import a25_def
-from .f3a_p25 import p25_def
-from .f3a_f25 import f25_def
-from .imac_unlimited_2024 import sdef as imac_unl2024_def
-from .f3auk_clubman import clubman_def as f3auk_club_def
-from .f3auk_Intermediate import intermediate_def as f3auk_int_def
-
-sdefs = {
-    'f3a_p23_schedule': p23_def, 
-    'f3a_a25_schedule': a25_def, 
-    'f3a_p25_schedule': p25_def, 
-    'f3a_f25_schedule': f25_def, 
-    'IMAC_Unlimited2024_schedule': imac_unl2024_def, 
-    'f3auk_clubman_schedule': f3auk_club_def, 
-    'f3auk_inter_schedule': f3auk_int_def
+"""Build every schedule definition, check that each manoeuvre creates a template and write the
+definitions and their precompiled template libraries to the package data.
+
+The builders are quick but the templates are not, so each manoeuvre is checked and precompiled
+in its own process, from the dict that will be written (as it is when loaded by SchedDef.load).
+A schedule is only written if all of its manoeuvres pass.
+
+    python -m examples.schedules_construction.create_all [names] [--workers n] [--folder path]
+"""
+from __future__ import annotations
+import importlib
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from json import dump, dumps, loads
+from pathlib import Path
+from flightdata.base.numpy_encoder import NumpyEncoder
+from flightanalysis.definition import ManDef
+from flightanalysis.definition.library import TemplateLibrary
+
+
+schedules = {
+    'f3a_p23': ('f3a_p23', 'p23_def'),
+    'f3a_a25': ('f3a_a25', 'a25_def'),
+    'f3a_p25': ('f3a_p25', 'p25_def'),
+    'f3a_f25': ('f3a_f25', 'f25_def'),
+    'IMAC_Unlimited2024': ('imac_unlimited_2024', 'sdef'),
+    'f3auk_clubman': ('f3auk_clubman', 'clubman_def'),
+    'f3auk_inter': ('f3auk_Intermediate', 'intermediate_def'),
 }
 
 
-for sdef in sdefs:
-    sdef.to_json("flightanalysis/data/p23_schedule.json")
\ No newline at end of file
+def build(name: str) -> dict[str, dict]:
+    """The definition of a schedule as it will be written, the ManDef dicts by short name"""
+    module, attr = schedules[name]
+    sdef = getattr(importlib.import_module(f"{__package__}.{module}"), attr)
+    return loads(dumps(sdef.to_dict(), cls=NumpyEncoder))
+
+
+def compile_manoeuvre(data: dict) -> TemplateLibrary | str:
+    """Check that a manoeuvre definition creates a template and precompile its templates.
+    Returns the error message if it fails."""
+    try:
+        mdef = ManDef.from_dict(data)
+        mdef.create_template(mdef.info.initial_transform(170, 1))
+        return TemplateLibrary.build([mdef])
+    except Exception as ex:
+        return f"{ex.__class__.__name__}: {ex}"
+
+
+def compile_schedules(names: list[str]=None, folder: str | Path="flightanalysis/data", workers: int=None) -> dict[str, list[str]]:
+    """Build, check and write schedules, with the manoeuvres of all of them on one process pool.
+
+    Args:
+        names (list[str], optional): keys of schedules. Defaults to all of them.
+        folder (str | Path, optional): where to write the definitions and libraries.
+        workers (int, optional): the number of processes, 1 to run in this process. Defaults to
+            the number of cpus.
+
+    Returns:
+        dict[str, list[str]]: the errors of each schedule, empty if it was written
+    """
+    names = list(schedules.keys()) if names is None else names
+    sdefs = {name: build(name) for name in names}
+    tasks = [data for sdef in sdefs.values() for data in sdef.values()]
+
+    if workers == 1:
+        results = [compile_manoeuvre(data) for data in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(compile_manoeuvre, tasks))
+
+    folder = Path(folder)
+    errors = {}
+    for name, sdef in sdefs.items():
+        libraries, results = results[:len(sdef)], results[len(sdef):]
+        errors[name] = [f"{uid}: {lib}" for uid, lib in zip(sdef.keys(), libraries) if isinstance(lib, str)]
+        if len(errors[name]) == 0:
+            with open(folder / f"{name}_schedule.json", "w") as f:
+                dump(sdef, f, indent=2)
+            TemplateLibrary.concatenate(libraries).save(folder / f"{name.lower()}_templates")
+    return errors
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="build the schedule definitions and template libraries")
+    parser.add_argument("names", nargs="*", help=f"any of {', '.join(schedules.keys())}")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--folder", default="flightanalysis/data")
+    args = parser.parse_args()
+    unknown = [n for n in args.names if n not in schedules]
+    if len(unknown) > 0:
+        parser.error(f"unknown schedules {unknown}")
+
+    for name, errs in compile_schedules(args.names or None, args.folder, args.workers).items():
+        print(f"{name}: {'written' if len(errs) == 0 else 'failed'}")
+        for err in errs:
+            print(f"    {err}")
@@ -1,3 +1,5 @@
 from .el_analysis import ElementAnalysis
 from .man_analysis import ManoeuvreAnalysis
-from .sch_analysis import ScheduleAnalysis
\ No newline at end of file
+from .sch_analysis import ScheduleAnalysis
+from .store import MeasurementStore
+from .calibration import Calibration, sensitivity
\ No newline at end of file
@@ -0,0 +1,296 @@
+"""Calibration of the Exponential lookups in a criteria set against reference scores.
+
+Each downgrade made from a stored measurement is lookup(error) * weight, where the error and
+the weight (the visibility, and for Bounded criteria the fraction of the element) do not depend
+on the lookup. The errors and weights for every criteria path are collected once for the whole
+corpus. Any number of candidate Exponential(factor, exponent, limit) can then be evaluated
+together by broadcasting the candidates against the errors, and summing the downgrades for each
+manoeuvre of each flight. The derivatives of the scores with respect to the lookup parameters
+are found analytically from the same errors and weights.
+"""
+from __future__ import annotations
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Self
+from flightanalysis.definition import ManParm
+from flightanalysis.scoring import Criteria, Exponential, Results
+from flightanalysis.scoring.criteria.f3a_criteria import F3A
+from .store import MeasurementStore, criteria_paths, criteria_set, with_criteria
+
+
+unit = Exponential(1, 0, np.inf) # a lookup of 1 for any error, so downgrades are the weights
+
+
+@dataclass
+class Samples:
+    """The errors and weights of the downgrades made with one criteria path, sorted by the
+    group (flight and manoeuvre) they belong to"""
+    errors: npt.NDArray
+    weights: npt.NDArray
+    groups: npt.NDArray
+
+    def downgrades(self, lookups: npt.NDArray, ngroups: int, chunk: int=2**22) -> npt.NDArray:
+        """The total downgrade of each group for each candidate lookup
+
+        Args:
+            lookups (npt.NDArray): (K, 3) candidate factors, exponents and limits
+            ngroups (int): the number of groups
+            chunk (int, optional): the maximum size of the (candidates, errors) array.
+
+        Returns:
+            npt.NDArray: (K, ngroups) downgrades
+        """
+        out = np.zeros((len(lookups), ngroups))
+        if len(self.errors) == 0:
+            return out
+        with np.errstate(divide='ignore'):
+            logx = np.log(self.errors)
+        counts = np.bincount(self.groups, minlength=ngroups)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[counts > 0]
+        step = max(1, chunk // len(self.errors))
+        for i in range(0, len(lookups), step):
+            factor, exponent, limit = lookups[i:i + step].T[:, :, None]
+            with np.errstate(invalid='ignore'):
+                dgs = np.minimum(factor * np.exp(exponent * logx), limit) * self.weights
+            out[i:i + step, counts > 0] = np.add.reduceat(dgs, starts, axis=1)
+        return out
+
+    def gradient(self, lookup: npt.NDArray, ngroups: int) -> npt.NDArray:
+        """The derivative of the total downgrade of each group with respect to the factor,
+        exponent and limit of a lookup. Below the limit the downgrade is factor * error**exponent
+        * weight, above it is limit * weight.
+
+        Args:
+            lookup (npt.NDArray): (3,) factor, exponent and limit
+            ngroups (int): the number of groups
+
+        Returns:
+            npt.NDArray: (3, ngroups) derivatives
+        """
+        factor, exponent, limit = lookup
+        with np.errstate(divide='ignore', invalid='ignore'):
+            power = self.errors ** exponent
+            below = factor * power < limit
+            logx = np.where(self.errors > 0, np.log(self.errors), 0)
+        return np.vstack([
+            np.bincount(self.groups, np.where(below, power, 0) * self.weights, ngroups),
+            np.bincount(self.groups, np.where(below, factor * power * logx, 0) * self.weights, ngroups),
+            np.bincount(self.groups, np.where(below, 0, self.weights), ngroups),
+        ])
+
+
+class Calibration:
+    """The errors and weights of a corpus of stored flights.
+        samples (dict[str, Samples]): for each path in the criteria set
+        fixed (npt.NDArray): the downgrades of each group that do not depend on the criteria set,
+            from the positioning and any measurements whose criteria is not in the set
+        index (pd.MultiIndex): the flight and manoeuvre of each group
+        cset: the criteria set
+    """
+    def __init__(self, samples: dict[str, Samples], fixed: npt.NDArray, index: pd.MultiIndex, cset=F3A):
+        self.samples = samples
+        self.fixed = fixed
+        self.index = index
+        self.cset = cset
+
+    @staticmethod
+    def build(stores: dict[str, MeasurementStore], cset=F3A) -> Calibration:
+        """Collect the errors and weights from the measurements of each flight"""
+        paths = criteria_paths(cset)
+        index, fixed = [], []
+        collected = {path: [] for path in paths}
+
+        for flight, store in stores.items():
+            gids = {}
+            for uid, man in store.index['manoeuvres'].items():
+                gids[uid] = len(index)
+                index.append((flight, uid))
+                fixed.append(Results.from_dict(man['positioning']).total)
+
+            batches = {}
+            for i, entry in enumerate(store.index['entries']):
+                g, m = gids[entry['manoeuvre']], store.measurement(i)
+                if entry['key'] in paths:
+                    criteria = replace(paths[entry['key']], lookup=unit)
+                else:
+                    criteria = Criteria.from_dict(entry['criteria'])
+
+                if entry['element'] is None:
+                    res = ManParm.score(entry['name'], criteria, entry['ids'], m)
+                    if entry['key'] in paths:
+                        collected[entry['key']].append((res, g))
+                    else:
+                        fixed[g] += res.total
+                elif entry['key'] in paths:
+                    batches.setdefault(entry['key'], (criteria, [], [], []))
+                    batches[entry['key']][1].append(entry['name'])
+                    batches[entry['key']][2].append(m)
+                    batches[entry['key']][3].append(g)
+                else:
+                    fixed[g] += criteria(entry['name'], m).total
+
+            for key, (criteria, names, ms, gs) in batches.items():
+                collected[key] += zip(criteria.batch(names, ms), gs)
+
+        samples = {}
+        for path, results in collected.items():
+            if len(results) == 0:
+                continue
+            groups = np.concatenate([np.full(len(res.errors), g) for res, g in results]).astype(int)
+            order = np.argsort(groups, kind='stable')
+            samples[path] = Samples(
+                np.concatenate([res.errors for res, _ in results]).astype(float)[order],
+                np.concatenate([res.dgs for res, _ in results]).astype(float)[order],
+                groups[order]
+            )
+        return Calibration(
+            samples, np.array(fixed),
+            pd.MultiIndex.from_tuples(index, names=['flight', 'manoeuvre']), cset
+        )
+
+    @staticmethod
+    def load(files: list[str | Path], cset=F3A) -> Self:
+        """Build from stores written by MeasurementStore.save, the flights are named by the file stem"""
+        return Calibration.build({Path(f).stem: MeasurementStore.load(f) for f in files}, cset)
+
+    def lookups(self) -> dict[str, npt.NDArray]:
+        """The factor, exponent and limit of the current lookup for each path with samples"""
+        paths = criteria_paths(self.cset)
+        return {p: np.array([[paths[p].lookup.factor, paths[p].lookup.exponent, paths[p].lookup.limit]]) for p in self.samples}
+
+    def downgrades(self) -> pd.Series:
+        """The total downgrade of each manoeuvre with the lookups in the criteria set"""
+        return pd.Series(
+            self.fixed + sum(self.samples[p].downgrades(lu, len(self.index))[0] for p, lu in self.lookups().items()),
+            index=self.index
+        )
+
+    def sensitivity(self, relative: bool=False) -> pd.DataFrame:
+        """The derivative of the score of each manoeuvre with respect to the factor, exponent
+        and limit of every lookup in the criteria set. The score is 10 - the total downgrade, so
+        it is the negative of the downgrade derivative, or 0 where the score is 0.
+
+        Args:
+            relative (bool, optional): multiply by the parameter, giving the change in score for
+                a 100% change in the parameter. Defaults to False.
+
+        Returns:
+            pd.DataFrame: rows for each flight and manoeuvre, columns for each path and parameter
+        """
+        lookups = self.lookups()
+        scoring = self.downgrades().to_numpy() < 10
+        columns, data = [], []
+        for path, lookup in lookups.items():
+            grads = -self.samples[path].gradient(lookup[0], len(self.index)) * scoring
+            if relative:
+                grads = np.where(grads == 0, 0, grads * lookup[0][:, None])
+            for parameter, grad in zip(['factor', 'exponent', 'limit'], grads):
+                columns.append((path, parameter))
+                data.append(grad)
+        return pd.DataFrame(
+            np.column_stack(data) if len(data) else np.zeros((len(self.index), 0)),
+            index=self.index, 
+            columns=pd.MultiIndex.from_tuples(columns, names=['path', 'parameter'])
+        )
+
+    @staticmethod
+    def grid(lookup: Exponential, n: int=11, spread: float=2) -> npt.NDArray:
+        """Candidates with factors from lookup.factor / spread to lookup.factor * spread and
+        exponents from lookup.exponent / sqrt(spread) to lookup.exponent * sqrt(spread),
+        spaced geometrically so the current lookup is in the middle. The limit is unchanged."""
+        factors, exponents = np.meshgrid(
+            lookup.factor * np.geomspace(1 / spread, spread, n),
+            lookup.exponent * np.geomspace(1 / np.sqrt(spread), np.sqrt(spread), n)
+        )
+        return np.column_stack([factors.ravel(), exponents.ravel(), np.full(factors.size, lookup.limit)])
+
+    def fit(self, reference: pd.DataFrame, grids: dict[str, npt.NDArray]=None, rounds: int=2) -> tuple[type, pd.DataFrame]:
+        """Fit the lookups to reference scores by coordinate descent. In turn, for each path,
+        every candidate in its grid is evaluated with the other paths held at their current
+        best and the one with the lowest rms error between the predicted and the reference
+        manoeuvre scores is kept.
+
+        Args:
+            reference (pd.DataFrame): the reference score of each manoeuvre (columns) for each
+                flight (rows), NaN where there is none.
+            grids (dict[str, npt.NDArray], optional): (K, 3) candidate factors, exponents and
+                limits for each path to fit. Defaults to Calibration.grid around the current
+                lookup of every path with samples and a non zero factor.
+            rounds (int, optional): the number of passes over the paths. Defaults to 2.
+
+        Returns:
+            tuple[type, pd.DataFrame]: the best fit criteria set and the lookup and rms error
+                after each step
+        """
+        paths = criteria_paths(self.cset)
+        if grids is None:
+            grids = {p: Calibration.grid(paths[p].lookup) for p in self.samples if not paths[p].lookup.factor == 0}
+
+        ref = np.array([
+            reference.at[f, m] if f in reference.index and m in reference.columns else np.nan
+            for f, m in self.index
+        ], dtype=float)
+        valid = ~np.isnan(ref)
+
+        def rmse(dgs: npt.NDArray) -> npt.NDArray:
+            return np.sqrt(np.mean((np.maximum(0, 10 - dgs[..., valid]) - ref[valid])**2, axis=-1))
+
+        best = self.lookups()
+        contributions = {p: self.samples[p].downgrades(lu, len(self.index))[0] for p, lu in best.items()}
+        total = self.fixed + sum(contributions.values())
+        stats = [dict(round=0, path=None, factor=np.nan, exponent=np.nan, limit=np.nan, rmse=rmse(total))]
+
+        for i in range(rounds):
+            for path, grid in grids.items():
+                base = total - contributions[path]
+                candidates = self.samples[path].downgrades(grid, len(self.index))
+                errors = rmse(base + candidates)
+                k = np.argmin(errors)
+                best[path], contributions[path] = grid[k:k+1], candidates[k]
+                total = base + candidates[k]
+                stats.append(dict(round=i + 1, path=path, factor=grid[k, 0], exponent=grid[k, 1], limit=grid[k, 2], rmse=errors[k]))
+
+        return with_criteria(self.cset, {
+            p: replace(paths[p], lookup=Exponential(*best[p][0])) for p in grids
+        }), pd.DataFrame(stats)
+
+
+def _sensitivity(file: str | Path, paths: dict[str, Criteria], relative: bool) -> pd.DataFrame:
+    return Calibration.load([file], criteria_set(paths)).sensitivity(relative)
+
+
+def sensitivity(files: list[str | Path], cset=F3A, relative: bool=False, workers: int=None) -> pd.DataFrame:
+    """The score sensitivity of many stored flights, see Calibration.sensitivity. Each flight is
+    loaded and differentiated in its own process.
+
+    Args:
+        files (list[str | Path]): stores written by MeasurementStore.save, the flights are named
+            by the file stem
+        cset: the criteria set. Defaults to F3A.
+        relative (bool, optional): the change in score for a 100% change in each parameter.
+            Defaults to False.
+        workers (int, optional): the number of processes, 1 to run in this process. Defaults
+            to the number of cpus.
+
+    Returns:
+        pd.DataFrame: rows for each manoeuvre of each flight followed by the flight total, 
+            columns for each path and parameter
+    """
+    paths = criteria_paths(cset)
+    if workers == 1:
+        tables = [_sensitivity(f, paths, relative) for f in files]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            tables = list(pool.map(_sensitivity, files, [paths] * len(files), [relative] * len(files)))
+
+    rows = []
+    for file, table in zip(files, tables):
+        rows += [table, pd.DataFrame(
+            [table.sum()], 
+            index=pd.MultiIndex.from_tuples([(Path(file).stem, 'total')], names=table.index.names)
+        )]
+    return pd.concat(rows).fillna(0) if len(rows) else pd.DataFrame()
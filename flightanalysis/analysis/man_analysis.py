@@ -4,6 +4,7 @@ from .el_analysis import ElementAnalysis
 from flightdata import State, Flight, Origin
 from flightanalysis.definition import ManDef, SchedDef
 from flightanalysis.manoeuvre import Manoeuvre
+from flightanalysis.template import LazyTemplate
 from flightanalysis.scoring import Results, Result, ManoeuvreResults
 from flightanalysis.scoring.criteria.f3a_criteria import F3A
 from flightanalysis.definition.maninfo import Position
@@ -25,7 +26,7 @@ class ManoeuvreAnalysis:
     manoeuvre: Manoeuvre
     template: State
     corrected: Manoeuvre
-    corrected_template: State
+    corrected_template: State | LazyTemplate
     
     def __getitem__(self, i):
         return self.get_ea(self.mdef.eds[i])
@@ -106,8 +107,7 @@ class ManoeuvreAnalysis:
     
     @staticmethod
     def basic_manoeuvre(mdef: ManDef, itrans: g.Transformation) -> tuple[Manoeuvre, State]:
-        man = mdef.create(itrans).add_lines()
-        return man, man.create_template(itrans)
+        return mdef.create_template(itrans)
 
     @staticmethod
     def alignment(manoeuvre: State, man: Manoeuvre, flown: State, radius=10, replace=False) -> tuple[float, State]:
@@ -129,34 +129,43 @@ class ManoeuvreAnalysis:
         return manoeuvre.optimise_alignment(template[0], aligned)
     
     @staticmethod
-    def correction(mdef: ManDef, manoeuvre: Manoeuvre, int_tp: State) -> tuple[ManDef, Manoeuvre]:
-        mdef = ManDef(mdef.info, mdef.mps.update_defaults(manoeuvre), mdef.eds)
-        return mdef, mdef.create(int_tp[0].transform).add_lines()
+    def correction(mdef: ManDef, manoeuvre: Manoeuvre, int_tp: State, previous: Manoeuvre=None) -> tuple[ManDef, Manoeuvre]:
+        """previous is a manoeuvre created from mdef, its unaffected elements are reused"""
+        cmdef = mdef.update_defaults(manoeuvre)
+        if previous is None:
+            return cmdef, cmdef.create(int_tp[0].transform).add_lines()
+        return cmdef, cmdef.recreate(
+            previous, 
+            cmdef.mps.changed(mdef.mps), 
+            int_tp[0].transform
+        ).add_lines()
 
     @staticmethod
     def from_pa(pa: PartialAnalysis):
         return ManoeuvreAnalysis.build(pa.mdef, pa.fl)
     
     @staticmethod
-    def build(mdef: ManDef, flown: State):
+    def build(mdef: ManDef, flown: State, resample: bool=False):
+        """resample to interpolate the element templates rather than create them, see 
+        Manoeuvre.create_template"""
         itrans = ManoeuvreAnalysis.initial_transform(mdef, flown)
         man, tp = ManoeuvreAnalysis.basic_manoeuvre(mdef, itrans)
         success, dist, aligned = ManoeuvreAnalysis.alignment(tp, man, flown)
         if not success:
             raise Exception('Alignment failed')
         manoeuvre, int_tp = ManoeuvreAnalysis.intention(man, aligned, tp)
-        mdef, corr = ManoeuvreAnalysis.correction(mdef, manoeuvre, int_tp)
+        mdef, corr = ManoeuvreAnalysis.correction(mdef, manoeuvre, int_tp, man)
         manoeuvre = manoeuvre.copy_directions(corr)
-        int_tp = manoeuvre.el_matched_tp(int_tp[0], aligned)
+        int_tp = manoeuvre.el_matched_tp(int_tp[0], aligned, resample)
 
-        return ManoeuvreAnalysis(mdef, aligned, manoeuvre, int_tp, corr, corr.create_template(int_tp[0], aligned))
+        return ManoeuvreAnalysis(mdef, aligned, manoeuvre, int_tp, corr, corr.create_template(int_tp[0], aligned, lazy=True, resample=resample))
 
     def optimise_alignment(self):
         aligned = self.alignment_optimisation(self.manoeuvre, self.template, self.aligned)
         manoeuvre, int_tp = ManoeuvreAnalysis.intention(self.manoeuvre, aligned, self.template)
-        mdef, corr = ManoeuvreAnalysis.correction(self.mdef, manoeuvre, int_tp)
+        mdef, corr = ManoeuvreAnalysis.correction(self.mdef, manoeuvre, int_tp, self.corrected)
         return ManoeuvreAnalysis(mdef, aligned, manoeuvre, int_tp, corr, 
-                                 corr.create_template(int_tp[0], aligned))
+                                 corr.create_template(int_tp[0], aligned, lazy=True))
     
     def plot_3d(self, **kwargs):
         from flightplotting import plotsec, plotdtw
@@ -230,8 +239,8 @@ class ManoeuvreAnalysis:
         
         return Result("distance", [], [],[dist],[dist_dg],dist_key)
 
-    def intra(self):
-        return self.manoeuvre.analyse(self.aligned, self.template)
+    def intra(self, dtype=np.float64):
+        return self.manoeuvre.analyse(self.aligned, self.template, dtype)
 
     def inter(self):
         return self.mdef.mps.collect(self.manoeuvre, self.template)
@@ -247,10 +256,10 @@ class ManoeuvreAnalysis:
         pres.add(self.side_box())
         return pres
 
-    def scores(self):
+    def scores(self, dtype=np.float64):
         return ManoeuvreResults(
             self.inter(), 
-            self.intra(), 
+            self.intra(dtype), 
             self.positioning()
         )
     
@@ -265,7 +274,7 @@ class ManoeuvreAnalysis:
 
         state = State.from_flight(flight, box).splitter_labels(
             data["mans"],
-            [m.info.short_name for m in sdef]
+            [info.short_name for info in sdef.infos]
         )
         mdef= sdef[mid]
         return ManoeuvreAnalysis.build(
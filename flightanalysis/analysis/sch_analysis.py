@@ -1,8 +1,11 @@
 from typing import Self
+import numpy as np
 from json import load
 from flightdata import Flight, State, Origin, Collection
 from flightanalysis.definition import SchedDef, ScheduleInfo
+from flightanalysis.scoring import BatchScorer, ElementsResults
 from .man_analysis import ManoeuvreAnalysis
+from .store import MeasurementStore
 
 
 class ScheduleAnalysis(Collection):
@@ -20,7 +23,7 @@ class ScheduleAnalysis(Collection):
 
         state = State.from_flight(flight, box).splitter_labels(
             data["mans"],
-            [m.info.short_name for m in sdef]
+            [info.short_name for info in sdef.infos]
         )
         mas=[]
         for mdef in sdef:
@@ -31,6 +34,21 @@ class ScheduleAnalysis(Collection):
         
         return ScheduleAnalysis(mas)
 
+    def intra(self, dtype=np.float64) -> dict[str, ElementsResults]:
+        """The intra results for each manoeuvre, with each criteria evaluated once for the 
+        whole schedule. dtype=np.float32 for the single precision mode of BatchScorer"""
+        scorer = BatchScorer(dtype)
+        ends = []
+        for ma in self:
+            ma.manoeuvre.measure(ma.aligned, ma.template, scorer)
+            ends.append(len(scorer.uids))
+        ers = scorer.evaluate()
+        return {ma.uid: ElementsResults(ers[i0:i1]) for ma, i0, i1 in zip(self, [0] + ends[:-1], ends)}
+
+    def measurement_store(self) -> MeasurementStore:
+        """Store the measurements of every manoeuvre so they can be rescored with new criteria"""
+        return MeasurementStore.build(self)
+
     @staticmethod
     def from_fcscore(file: str) -> Self:
         with open(file, 'r') as f:
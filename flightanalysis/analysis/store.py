@@ -0,0 +1,241 @@
+"""Stored measurements, so that flights can be rescored with new criteria without repeating
+the analysis.
+
+Making the measurements (alignment, templates, the Measurement constructors) is nearly all of
+the cost of scoring a flight, whereas applying the criteria to them is cheap. The store keeps
+the value, direction and visibility of every intra and inter Measurement as rows of a single
+array, alongside a json index that records which manoeuvre, element and downgrade each one
+belongs to, its expected value and the criteria it was scored with. Criteria are identified by
+their path in a criteria set such as F3A (e.g. intra.roll), so a new set with the same layout
+can be applied to the stored measurements alone. When only some of the criteria change, patch
+rescores just the measurements that use them and updates existing results in place.
+"""
+from __future__ import annotations
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from pathlib import Path
+from json import dump, load
+from typing import Self
+from flightdata.base.numpy_encoder import NumpyEncoder
+from geometry import Point
+from flightanalysis.definition import ManParm
+from flightanalysis.scoring import (
+    Measurement, Results, ElementsResults, ManoeuvreResults, BatchScorer, Criteria, Combination
+)
+from flightanalysis.scoring.criteria.f3a_criteria import F3A
+from .man_analysis import ManoeuvreAnalysis
+
+
+def criteria_paths(cset=F3A) -> dict[str, Criteria]:
+    """The criteria in a criteria set by their path, for example intra.roll for F3A.intra.roll. 
+    Inherited criteria are included, so a new set can subclass an existing one."""
+    groups = {gname: getattr(cset, gname) for gname in dir(cset) if not gname.startswith('_')}
+    return {
+        f'{gname}.{cname}': getattr(group, cname)
+        for gname, group in groups.items() if isinstance(group, type)
+        for cname in dir(group) if isinstance(getattr(group, cname), Criteria)
+    }
+
+
+def criteria_diff(old, new) -> dict[str, Criteria]:
+    """The criteria in new that are not in old or that differ from those in old"""
+    old_paths = criteria_paths(old)
+    return {k: c for k, c in criteria_paths(new).items() if not (k in old_paths and old_paths[k] == c)}
+
+
+def with_criteria(cset, changes: dict[str, Criteria]):
+    """A new criteria set that subclasses cset, with the criteria at the paths in changes replaced"""
+    groups = {}
+    for path, criteria in changes.items():
+        gname, cname = path.split('.')
+        groups.setdefault(gname, {})[cname] = criteria
+    return type(cset.__name__, (cset,), {
+        gname: type(getattr(cset, gname).__name__, (getattr(cset, gname),), crits)
+        for gname, crits in groups.items()
+    })
+
+
+def criteria_set(paths: dict[str, Criteria], name: str='CriteriaSet'):
+    """A criteria set with the criteria at the given paths, the inverse of criteria_paths. The
+    paths can be pickled where sets made by with_criteria cannot, so this rebuilds a set in
+    another process."""
+    groups = {}
+    for path, criteria in paths.items():
+        gname, cname = path.split('.')
+        groups.setdefault(gname, {})[cname] = criteria
+    return type(name, (), {gname: type(gname, (), crits) for gname, crits in groups.items()})
+
+
+def criteria_key(criteria: Criteria, cset=F3A) -> str | None:
+    """The path of criteria in the criteria set, None if it is not there"""
+    paths = criteria_paths(cset)
+    for key, crit in paths.items():
+        if crit is criteria:
+            return key
+    for key, crit in paths.items():
+        if crit == criteria:
+            return key
+
+
+class MeasurementStore:
+    """The measurements of one or more flights.
+        arrays (list[npt.NDArray]): value, direction (x, y, z) and visibility columns for each entry
+        index (dict): manoeuvres - the elements and positioning results of each manoeuvre
+                      entries - the manoeuvre, element, name, criteria and expected value of
+                      each measurement. Inter entries also have the collector ids.
+    """
+    columns = ['value', 'dx', 'dy', 'dz', 'visibility']
+
+    def __init__(self, arrays: list[npt.NDArray]=None, index: dict=None):
+        self.arrays = [] if arrays is None else arrays
+        self.index = dict(manoeuvres={}, entries=[]) if index is None else index
+
+    def __len__(self):
+        return len(self.index['entries'])
+
+    def add(self, manoeuvre: str, element: str | None, name: str, criteria: Criteria, m: Measurement, ids: list[str]=None):
+        """Add a measurement, element is None for inter measurements"""
+        self.arrays.append(np.column_stack([
+            np.asarray(m.value, dtype=float),
+            np.broadcast_to(m.direction.data, (len(m), 3)),
+            np.asarray(m.visibility, dtype=float)
+        ]))
+        self.index['entries'].append(dict(
+            manoeuvre=manoeuvre, element=element, name=name,
+            key=criteria_key(criteria), criteria=criteria.to_dict(),
+            expected=m.expected, ids=ids
+        ))
+
+    def add_analysis(self, ma: ManoeuvreAnalysis):
+        """Measure the intra and inter downgrades of a manoeuvre and store them. The positioning
+        results do not use Measurements so they are stored as they are."""
+        scorer = BatchScorer()
+        ma.manoeuvre.measure(ma.aligned, ma.template, scorer)
+        for eli, name, criteria, m in scorer.measurements:
+            self.add(ma.uid, scorer.uids[eli], name, criteria, m)
+
+        els = ma.manoeuvre.all_elements()
+        for mp in ma.mdef.mps:
+            if not isinstance(mp.criteria, Combination):
+                ids, m = mp.measure(els, ma.template)
+                self.add(ma.uid, None, mp.name, mp.criteria, m, ids)
+
+        self.index['manoeuvres'][ma.uid] = dict(
+            elements=scorer.uids,
+            positioning=ma.positioning().to_dict()
+        )
+
+    @staticmethod
+    def build(mas: list[ManoeuvreAnalysis]) -> MeasurementStore:
+        store = MeasurementStore()
+        for ma in mas:
+            store.add_analysis(ma)
+        return store
+
+    def measurement(self, i: int) -> Measurement:
+        arr = self.arrays[i]
+        return Measurement(arr[:, 0], self.index['entries'][i]['expected'], Point(arr[:, 1:4]), arr[:, 4])
+
+    def rescore(self, cset=F3A) -> dict[str, ManoeuvreResults]:
+        """Apply the criteria in cset to the stored measurements. Measurements whose criteria
+        is not in cset are scored with the criteria they were stored with.
+
+        Returns:
+            dict[str, ManoeuvreResults]: the results for each manoeuvre
+        """
+        paths = criteria_paths(cset)
+        intra = {}
+        inter = {uid: Results('Inter') for uid in self.index['manoeuvres']}
+        for i, entry in enumerate(self.index['entries']):
+            criteria = paths[entry['key']] if entry['key'] in paths else Criteria.from_dict(entry['criteria'])
+            if entry['element'] is None:
+                inter[entry['manoeuvre']].add(ManParm.score(entry['name'], criteria, entry['ids'], self.measurement(i)))
+            else:
+                intra.setdefault((entry['manoeuvre'], entry['element']), []).append(
+                    (entry['name'], criteria, self.measurement(i))
+                )
+
+        scorer = BatchScorer()
+        ends = []
+        for uid, man in self.index['manoeuvres'].items():
+            for element in man['elements']:
+                scorer.add_measurements(element, intra.get((uid, element), []))
+            ends.append(len(scorer.uids))
+        ers = scorer.evaluate()
+
+        return {uid: ManoeuvreResults(
+            inter[uid],
+            ElementsResults(ers[i0:i1]),
+            Results.from_dict(man['positioning'])
+        ) for (uid, man), i0, i1 in zip(self.index['manoeuvres'].items(), [0] + ends[:-1], ends)}
+
+    def patch(self, results: dict[str, ManoeuvreResults], changes: dict[str, Criteria]) -> dict[str, float]:
+        """Rescore only the measurements whose criteria path is in changes (see criteria_diff)
+        and replace their Results in results, which must have been made from the same 
+        measurements.
+
+        Returns:
+            dict[str, float]: the change in the total downgrade of each manoeuvre
+        """
+        deltas = {uid: 0.0 for uid in results}
+        scorer = BatchScorer()
+        intra = []
+        for i, entry in enumerate(self.index['entries']):
+            if entry['key'] not in changes or entry['manoeuvre'] not in results:
+                continue
+            criteria = changes[entry['key']]
+            if entry['element'] is None:
+                deltas[entry['manoeuvre']] += results[entry['manoeuvre']].replace(
+                    None, ManParm.score(entry['name'], criteria, entry['ids'], self.measurement(i))
+                )
+            else:
+                scorer.add_measurements(entry['element'], [(entry['name'], criteria, self.measurement(i))])
+                intra.append(entry)
+
+        for entry, res in zip(intra, scorer.evaluate()):
+            deltas[entry['manoeuvre']] += results[entry['manoeuvre']].replace(entry['element'], res.data[entry['name']])
+        return deltas
+
+    def save(self, file: str | Path) -> Path:
+        """Write the measurements to file.npy and the index to file.json"""
+        file = Path(file)
+        rows = np.cumsum([0] + [len(arr) for arr in self.arrays])
+        for entry, r0, r1 in zip(self.index['entries'], rows[:-1], rows[1:]):
+            entry['rows'] = [int(r0), int(r1)]
+        np.save(
+            file.with_suffix('.npy'),
+            np.concatenate(self.arrays) if len(self.arrays) else np.zeros((0, len(self.columns)))
+        )
+        with open(file.with_suffix('.json'), 'w') as f:
+            dump(self.index, f, cls=NumpyEncoder)
+        return file
+
+    @staticmethod
+    def load(file: str | Path) -> Self:
+        """Memory map a store written by save"""
+        file = Path(file)
+        with open(file.with_suffix('.json'), 'r') as f:
+            index = load(f)
+        data = np.load(file.with_suffix('.npy'), mmap_mode='r')
+        return MeasurementStore([data[slice(*entry['rows'])] for entry in index['entries']], index)
+
+
+def patch_flights(flights: dict[str, tuple[MeasurementStore, dict[str, ManoeuvreResults]]], old, new) -> pd.DataFrame:
+    """Apply the differences between two criteria sets to the results of many flights.
+
+    Args:
+        flights (dict): the MeasurementStore and the results (scored with old) of each flight 
+        old: the criteria set the results were scored with
+        new: the criteria set to change to
+
+    Returns:
+        pd.DataFrame: the change in the score of each manoeuvre (columns) for each flight (rows)
+    """
+    changes = criteria_diff(old, new)
+    deltas = {}
+    for name, (store, results) in flights.items():
+        before = {uid: mr.score() for uid, mr in results.items()}
+        store.patch(results, changes)
+        deltas[name] = {uid: results[uid].score() - before[uid] for uid in results}
+    return pd.DataFrame.from_dict(deltas, orient='index')
@@ -1,5 +1,5 @@
 from pathlib import Path
-from pkg_resources import resource_stream, resource_listdir
+from pkg_resources import resource_stream, resource_listdir, resource_filename
 from json import loads
 
 
@@ -10,6 +10,10 @@ def get_json_resource(name):
     return loads(data)
 
 
+def get_resource_path(name) -> Path:
+    return Path(resource_filename(__name__, name.lower()))
+
+
 def list_resources(rtype: str):
     return [fname for fname in all_resources if fname.endswith(f'_{rtype}.json')]
 
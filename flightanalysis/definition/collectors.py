@@ -15,12 +15,25 @@ class Collector(Opp):
         """return the value"""        
         return getattr(els.data[self.elname], self.pname)#(tp[0].transform, fl))[0]
     
-    def visibility(self, els, state):
-        return getattr(els.data[self.elname], self.pname + '_visibility')(state.get_element(self.elname))
+    def visibility(self, els, state, cache: dict=None):
+        """The direction and visibility of the parameter. A cache dict shared between collectors
+        keeps the element slices of state and the visibilities that have already been found."""
+        if cache is None:
+            return getattr(els.data[self.elname], self.pname + '_visibility')(state.get_element(self.elname))
+        if (self.elname, self.pname) not in cache:
+            if self.elname not in cache:
+                cache[self.elname] = state.get_element(self.elname)
+            cache[(self.elname, self.pname)] = getattr(
+                els.data[self.elname], self.pname + '_visibility'
+            )(cache[self.elname])
+        return cache[(self.elname, self.pname)]
 
     def __str__(self):
         return self.name
 
+    def _source(self, compiler) -> str:
+        return compiler.slot(self.name, self, 'collector', self.elname, self.pname)
+
     @staticmethod
     def parse(ins, name=None):
         return Opp.parse_f(
@@ -45,6 +58,10 @@ class Collectors(Collection):
     VType=Opp
     uid="name"
 
+    def __setstate__(self, state):
+        # Collection.__getattr__ reads self.data, which does not exist until this has run
+        self.__dict__.update(state)
+
     def __str__(self):
         return ',\n'.join([str(v) for v in self])
     
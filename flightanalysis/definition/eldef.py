@@ -1,17 +1,58 @@
 import enum
-from typing import List, Callable, Union, Dict, Tuple
+from typing import List, Callable, Union, Dict, Tuple, Self
 import numpy as np
+import pandas as pd
 from flightanalysis.elements import *
-from inspect import getfullargspec
 from functools import partial
 from . import ManParm, ManParms, Opp, ItemOpp
 from flightdata import Collection
 from numbers import Number
 from . import Collector, Collectors
-import inspect
+from flightdata import State
 from uuid import uuid1
 
 
+class TemplateCache(dict):
+    """The canonical templates of the elements made by an ElDef, shared between them (and the 
+    origin templates of a ManDef). The least recently used templates are dropped beyond maxsize,
+    so analysing many flights (each with its own corrected parameters) does not grow it without
+    limit. A template can be deferred, so it is only loaded when it is first requested."""
+    class Deferred:
+        def __init__(self, load: Callable[[], State]):
+            self.load = load
+
+    def __init__(self, maxsize: int=64):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def defer(self, key, load: Callable[[], State]):
+        """Add a template that is made by load the first time it is requested"""
+        self[key] = TemplateCache.Deferred(load)
+
+    def __getitem__(self, key):
+        value = super().pop(key)
+        if isinstance(value, TemplateCache.Deferred):
+            value = value.load()
+        super().__setitem__(key, value)
+        return value
+
+    def values(self):
+        return [self[k] for k in list(self)]
+
+    def items(self):
+        return [(k, self[k]) for k in list(self)]
+
+    def __setitem__(self, key, value):
+        super().pop(key, None)
+        super().__setitem__(key, value)
+        while len(self) > self.maxsize:
+            del self[next(iter(self))]
+
+    def __reduce__(self):
+        # pickled empty, the templates are remade (or applied from a library) when needed
+        return (TemplateCache, (self.maxsize,))
+
+
 class ElDef:
     """This class creates a function to build an element (Loop, Line, Snap, Spin, Stallturn)
     based on a ManParms collection. 
@@ -31,6 +72,7 @@ class ElDef:
         self.Kind = Kind
         self.props = props       
         self.collectors = Collectors.from_eldef(self)
+        self._canonical = TemplateCache()
 
     def get_collector(self, name) -> Collector:
         return self.collectors[f"{self.name}.{name}"]
@@ -56,7 +98,7 @@ class ElDef:
 
     def __call__(self, mps: ManParms, **kwargs) -> Element:
         el_kwargs = {}
-        args = getfullargspec(self.Kind.__init__).args
+        args = self.Kind.init_args()
         for pname, prop in self.props.items():
             if pname in args:
                 
@@ -68,17 +110,51 @@ class ElDef:
                     else:
                         el_kwargs[pname] = mps.data[prop.name].value 
                 elif isinstance(prop, Opp):
-                    el_kwargs[pname] = prop(mps)
+                    el_kwargs[pname] = prop.compile()(mps)
                 elif isinstance(prop, Number):
                     el_kwargs[pname] = prop
                 else:
                     raise TypeError(f"Invalid prop type {prop.__class__.__name__}")
             
 
-        return self.Kind(uid=self.name, **el_kwargs) 
+        return self.create(**el_kwargs)
+
+    def create(self, **el_kwargs) -> Element:
+        """Create the element from its parameters. The element uses the canonical template
+        cache of the ElDef, so templates made by any element it creates are available to all
+        of them."""
+        el = self.Kind(uid=self.name, **el_kwargs) 
+        el._canonical = self._canonical
+        return el
+
+    def evaluate(self, values: Dict[str, np.ndarray], n: int) -> pd.DataFrame:
+        """The element parameters for many sets of ManParm values at once, see 
+        ManParms.variant_values. The Opp props are evaluated with CompiledOpp.evaluate.
+
+        Args:
+            values (Dict[str, np.ndarray]): the values of each ManParm for each variant
+            n (int): the number of variants
+
+        Returns:
+            pd.DataFrame: a column for each parameter and a row for each variant
+        """
+        args = self.Kind.init_args()
+        data = {}
+        for pname, prop in self.props.items():
+            if pname in args:
+                if isinstance(prop, ManParm):
+                    data[pname] = values[prop.name]
+                elif isinstance(prop, Opp):
+                    data[pname] = prop.compile().evaluate(values)
+                elif isinstance(prop, Number):
+                    data[pname] = prop
+                else:
+                    raise TypeError(f"Invalid prop type {prop.__class__.__name__}")
+                data[pname] = np.broadcast_to(data[pname], n)
+        return pd.DataFrame(data)
     
     def build(Kind, name, *args, **kwargs):
-        elargs = list(inspect.signature(Kind.__init__).parameters)[1:-1]
+        elargs = Kind.init_args()[:-1]
         for arg, argname in zip(args, elargs[:len(args)] ):
             kwargs[argname] = arg
         
@@ -92,6 +168,11 @@ class ElDef:
         
         return ed
 
+    @property
+    def dependencies(self) -> set[str]:
+        """The names of the ManParms that the props of this ElDef are built from"""
+        return {mp.name for prop in self.props.values() if isinstance(prop, Opp) for mp in prop.list_parms()}
+
     def rename(self, new_name):
         return ElDef(new_name, self.Kind, self.pfuncs)
     
@@ -110,6 +191,10 @@ class ElDefs(Collection):
     It provides attribute access to the ElDefs based on their names. 
     """
 
+    def __setstate__(self, state):
+        # Collection.__getattr__ reads self.data, which does not exist until this has run
+        self.__dict__.update(state)
+
     @staticmethod
     def from_dict(data: dict, mps: ManParms):
         return ElDefs([ElDef.from_dict(v, mps) for v in data.values()])
@@ -137,6 +222,11 @@ class ElDefs(Collection):
             return [self.add(e) for e in ed]
 
 
+    def dependents(self, mp_names: List[str]) -> Self:
+        """The ElDefs that depend on any of the named ManParms"""
+        mp_names = set(mp_names)
+        return ElDefs([ed for ed in self if len(ed.dependencies & mp_names) > 0])
+
     def builder_list(self, name:str) ->List[Callable]:
         """A list of the functions that return the requested parameter when constructing the elements from the mps"""
         return [e.props[name] for e in self if name in e.props]
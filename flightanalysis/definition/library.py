@@ -0,0 +1,162 @@
+"""A precompiled library of the default templates for a schedule definition.
+
+Creating the origin template for each manoeuvre and the canonical template for each
+element is the slowest part of loading a schedule for analysis. The library stores these
+for the manoeuvre defaults in a single binary array that can be memory mapped, alongside a
+json index describing where each template sits in the array. Each manoeuvre entry is
+stored with a hash of its definition so stale entries are ignored rather than used.
+"""
+from __future__ import annotations
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from pathlib import Path
+from functools import partial
+from hashlib import sha256
+from json import dump, dumps, load
+from typing import Self
+from flightdata import State
+from flightdata.base.numpy_encoder import NumpyEncoder
+from geometry import PX
+from flightanalysis.elements import Element
+from .mandef import ManDef
+
+
+def definition_hash(mdef: ManDef) -> str:
+    """A hash of the manoeuvre definition, used to invalidate the stored templates"""
+    return sha256(dumps(mdef.to_dict(), sort_keys=True, cls=NumpyEncoder).encode()).hexdigest()
+
+
+def _label_runs(st: State) -> dict[str, list]:
+    """run length encode the label columns of a state"""
+    runs = {}
+    for col in st.label_cols:
+        values = st.data[col].to_numpy()
+        starts = np.concatenate([[0], np.flatnonzero(values[1:] != values[:-1]) + 1])
+        runs[col] = [[values[s], int(n)] for s, n in zip(starts, np.diff(np.append(starts, len(values))))]
+    return runs
+
+
+class TemplateLibrary:
+    """Templates stored in rows of a single array, described by an index.
+        data (npt.NDArray): the State columns of all the templates, stacked
+        index (dict): columns and, for each manoeuvre, its definition hash, the rows of the
+            origin template and the rows of the canonical element templates.
+    """
+    def __init__(self, data: npt.NDArray, index: dict):
+        self.data = data
+        self.index = index
+
+    def _state(self, rows: list[int], labels: dict[str, list] = None) -> State:
+        arr = self.data[rows[0]:rows[1]]
+        df = pd.DataFrame(arr, columns=self.index['columns'], index=arr[:, 0], copy=False)
+        for col, runs in (labels or {}).items():
+            df[col] = np.repeat([r[0] for r in runs], [r[1] for r in runs])
+        return State(df, fill=False)
+
+    @staticmethod
+    def build(mdefs: list[ManDef]) -> TemplateLibrary:
+        """Create the templates for the defaults of each manoeuvre definition. The canonical 
+        templates are keyed on the velocity each element is entered with when the manoeuvre is
+        flown at its defaults, starting at its speed (so a stall turn is entered at the speed of
+        the line before it and the element after it from rest)."""
+        arrays = []
+        index = dict(columns=None, manoeuvres={})
+        nrows = 0
+
+        def add(st: State) -> list[int]:
+            nonlocal nrows
+            if index['columns'] is None:
+                index['columns'] = st.base_cols
+            arrays.append(st.data.loc[:, index['columns']].to_numpy(dtype=float))
+            nrows += len(st)
+            return [nrows - len(st), nrows]
+
+        for mdef in mdefs:
+            origin = mdef.origin_template()
+            canonicals = []
+            els = mdef._create().all_elements()
+            vel = PX(els[0].speed)
+            for el in els:
+                if el.constant_rate:
+                    template = el.canonical_template(vel)
+                    canonicals.append(dict(
+                        element=el.uid,
+                        parms=[getattr(el, p) for p in el.parameters],
+                        vel=list(Element.vel_key(vel)),
+                        rows=add(template)
+                    ))
+                else:
+                    template = el.create_template(State.from_transform(vel=vel))
+                vel = template.vel[-1]
+            index['manoeuvres'][mdef.uid] = dict(
+                hash=definition_hash(mdef),
+                origin=add(origin),
+                labels=_label_runs(origin),
+                canonical=canonicals
+            )
+
+        return TemplateLibrary(np.concatenate(arrays), index)
+
+    @staticmethod
+    def concatenate(libraries: list[TemplateLibrary]) -> TemplateLibrary:
+        """Join libraries built separately (for example one per manoeuvre on a process pool)
+        into one, ordering the columns as the first and offsetting the rows of each"""
+        index = dict(columns=libraries[0].index['columns'], manoeuvres={})
+        arrays = []
+        offset = 0
+        for library in libraries:
+            if not set(library.index['columns']) == set(index['columns']):
+                raise ValueError("cannot concatenate libraries with different columns")
+            arrays.append(library.data[:, [library.index['columns'].index(c) for c in index['columns']]])
+            shift = lambda rows: [rows[0] + offset, rows[1] + offset]
+            for uid, entry in library.index['manoeuvres'].items():
+                index['manoeuvres'][uid] = dict(
+                    entry,
+                    origin=shift(entry['origin']),
+                    canonical=[dict(can, rows=shift(can['rows'])) for can in entry['canonical']]
+                )
+            offset += len(library.data)
+        return TemplateLibrary(np.concatenate(arrays), index)
+
+    def save(self, file: str | Path) -> Path:
+        """Write the array to file.npy and the index to file.json"""
+        file = Path(file)
+        np.save(file.with_suffix('.npy'), self.data)
+        with open(file.with_suffix('.json'), 'w') as f:
+            dump(self.index, f, cls=NumpyEncoder)
+        return file
+
+    @staticmethod
+    def load(file: str | Path) -> Self:
+        """Memory map a library written by save, returns None if it does not exist"""
+        file = Path(file)
+        if not (file.with_suffix('.npy').exists() and file.with_suffix('.json').exists()):
+            return None
+        with open(file.with_suffix('.json'), 'r') as f:
+            index = load(f)
+        return TemplateLibrary(np.load(file.with_suffix('.npy'), mmap_mode='r'), index)
+
+    def apply(self, mdefs: list[ManDef]) -> list[str]:
+        """Populate the template caches of the manoeuvre definitions whose hash matches
+        the stored entry. The templates are deferred, so they are only read from the array
+        when they are first used.
+
+        Returns:
+            list[str]: the manoeuvres that were populated
+        """
+        applied = []
+        for mdef in mdefs:
+            entry = self.index['manoeuvres'].get(mdef.uid)
+            if entry is None or entry['hash'] != definition_hash(mdef):
+                continue
+            mdef._origins.defer(mdef._summary_key(), partial(self._state, entry['origin'], entry['labels']))
+            for can in entry['canonical']:
+                if can['element'] in mdef.eds.data:
+                    # the stored velocity is already a vel_key
+                    mdef.eds.data[can['element']]._canonical.defer(
+                        (tuple(can['parms']), tuple(can['vel'])),
+                        partial(self._state, can['rows'])
+                    )
+            applied.append(mdef.uid)
+        return applied
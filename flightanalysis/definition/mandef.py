@@ -11,14 +11,35 @@ elements collection.
 
 """
 from __future__ import annotations
-from typing import List
+from typing import List, Tuple
 import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from dataclasses import dataclass
 from flightanalysis.elements import Line, Elements
 from flightanalysis.manoeuvre import Manoeuvre
 from flightanalysis.definition.maninfo import ManInfo
 from flightdata import State
-from geometry import Transformation, Euler, Point
+from geometry import Transformation, Euler, Point, PX, PZ
 from . import ManParm, ManParms, ElDef, ElDefs, Position, Direction
+from .eldef import TemplateCache
+
+
+@dataclass
+class TemplateSummary:
+    """The parts of a manoeuvre template created at the origin that are needed to 
+    position the manoeuvre in the box.
+        x (npt.NDArray): the x positions of the template
+        y (npt.NDArray): the y positions of the template
+        centre_x (float): the x position that should be placed on the box centre
+    """
+    x: npt.NDArray
+    y: npt.NDArray
+    centre_x: float
+
+    @property
+    def length(self):
+        return self.x[-1] - self.x[0]
 
 
 class ManDef:
@@ -32,6 +53,12 @@ class ManDef:
         self.info: ManInfo = info
         self.mps: ManParms = ManParms.create_defaults_f3a() if mps is None else mps
         self.eds: ElDefs = ElDefs() if eds is None else eds
+        self._summaries: dict[tuple, TemplateSummary] = {}
+        self._origins: TemplateCache = TemplateCache()
+
+    def __getstate__(self):
+        # the origin templates are a cache, so they are not pickled
+        return dict(self.__dict__, _origins=TemplateCache())
 
     @property
     def uid(self):
@@ -53,6 +80,15 @@ class ManDef:
         return ManDef(info, mps, eds)
 
 
+    def update_defaults(self, intended: Manoeuvre) -> ManDef:
+        """A ManDef with the defaults updated from a manoeuvre (see ManParms.update_defaults), 
+        sharing the info and ElDefs of self. Returns self if none of the defaults change, so 
+        the cached templates are kept."""
+        mps = self.mps.update_defaults(intended)
+        if all(a is b for a, b in zip(mps, self.mps)):
+            return self
+        return ManDef(self.info, mps, self.eds)
+
     def create_entry_line(self, itrans: Transformation=None, target_depth=170) -> ElDef:
         """Create a line definition connecting Transformation to the start of this manoeuvre.
 
@@ -69,31 +105,16 @@ class ManDef:
                 
         heading = np.sign(itrans.rotation.transform_point(Point(1, 0, 0)).x[0]) # 1 for +ve x heading, -1 for negative x
 
-        #Create a template, at zero
-        man = self._create()
-        template = man.create_template(
-            State.from_transform(Transformation(
-                Point(0,0,0),
-                Euler(self.info.start.o.roll_angle(), 0, 0)
-        )))
+        summary = self.template_summary()
           
         if self.info.start.d == Direction.CROSS:
-            man_l = template.x[-1] - template.x[0]
-            length = man_l - target_depth
+            length = summary.length - target_depth
         else:
             if self.info.position == Position.CENTRE:
-                if len(self.info.centre_points) > 0:
-                    man_start_x = -man.elements[self.info.centre_points[0]].get_data(template).pos.x[0]
-                elif len(self.info.centred_els) > 0:
-                    ce, fac = self.info.centred_els[0]
-                    _x = man.elements[ce].get_data(template).pos.x
-                    man_start_x = -_x[int(len(_x) * fac)]
-                else:
-                    man_start_x = -(max(template.pos.x) + min(template.pos.x))/2
-                    
+                man_start_x = -summary.centre_x
             elif self.info.position ==  Position.END:
-                    box_edge = np.tan(np.radians(60)) * (np.abs(template.pos.y) + itrans.pos.y[0])
-                    man_start_x = min(box_edge - template.pos.x) 
+                box_edge = np.tan(np.radians(60)) * (np.abs(summary.y) + itrans.pos.y[0])
+                man_start_x = min(box_edge - summary.x) 
             length = max(man_start_x - itrans.translation.x[0] * heading, 30)
         return ElDef.build(
             Line,
@@ -102,6 +123,55 @@ class ManDef:
             length, 
             0)
 
+    def _summary_key(self) -> tuple:
+        """The things the origin template depends on: the defaults, each ElDef (its name, Kind
+        and props, in their serialised form) and the parts of the info that position it"""
+        return (
+            self.mps.defaults_key(),
+            tuple(
+                (ed.name, ed.Kind.__name__, tuple((k, str(v)) for k, v in ed.props.items()))
+                for ed in self.eds
+            ),
+            self.info.start.o,
+            tuple(self.info.centre_points),
+            tuple(tuple(ce) for ce in self.info.centred_els)
+        )
+
+    def origin_template(self) -> State:
+        """The template of this manoeuvre (without entry or exit lines) created at the origin.
+        It is cached against the ManParms defaults, so it is only created once for each set 
+        of defaults.
+        """
+        key = self._summary_key()
+        if key not in self._origins:
+            self._origins[key] = self._create().create_template(
+                State.from_transform(Transformation(
+                    Point(0,0,0),
+                    Euler(self.info.start.o.roll_angle(), 0, 0)
+            )))
+        return self._origins[key]
+
+    def template_summary(self) -> TemplateSummary:
+        """Summarise the origin template of this manoeuvre. The summary is cached 
+        against the ManParms defaults.
+        """
+        key = self._summary_key()
+        if key not in self._summaries:
+            man = self._create()
+            template = self.origin_template()
+
+            if len(self.info.centre_points) > 0:
+                centre_x = man.elements[self.info.centre_points[0]].get_data(template).pos.x[0]
+            elif len(self.info.centred_els) > 0:
+                ce, fac = self.info.centred_els[0]
+                _x = man.elements[ce].get_data(template).pos.x
+                centre_x = _x[int(len(_x) * fac)]
+            else:
+                centre_x = (max(template.pos.x) + min(template.pos.x))/2
+
+            self._summaries[key] = TemplateSummary(template.pos.x, template.pos.y, centre_x)
+        return self._summaries[key]
+
     def create(self, itrans=None, depth=None, wind=None) -> Manoeuvre:
         """Create the manoeuvre based on the default values in self.mps.
 
@@ -118,6 +188,82 @@ class ManDef:
             uid=self.info.short_name
         )
 
+    def create_template(self, itrans: Transformation) -> Tuple[Manoeuvre, State]:
+        """Create the manoeuvre with entry and exit lines and its template. The template
+        of the elements between the lines is moved from the origin template rather than 
+        generated again.
+
+        Args:
+            itrans (Transformation): initial position and orientation
+
+        Returns:
+            Tuple[Manoeuvre, State]: The manoeuvre and its template
+        """
+        man = self.create(itrans).add_lines()
+        entry = man.entry_line.create_template(State.from_transform(itrans, vel=PX()))
+
+        origin = self.origin_template()
+        rot = entry.att[-1] * origin.att[0].inverse()
+        if not np.allclose(rot.transform_point(PZ()).data, PZ().data):
+            # the templates are only equivalent when the manoeuvre is rotated about the world Z axis
+            return man, man.create_template(itrans)
+        
+        template = origin.move(Transformation(entry.pos[-1] - rot.transform_point(origin.pos[0]), rot))
+        exit = man.exit_line.create_template(template[-1])
+
+        return man, State.stack([entry, template, exit]).label(manoeuvre=man.uid)
+
+    def recreate(self, previous: Manoeuvre, changed: List[str], itrans: Transformation) -> Manoeuvre:
+        """Create the manoeuvre, reusing the elements of a manoeuvre created from an earlier version
+        of this ManDef where none of the ManParms they depend on have changed. Reused elements keep 
+        their cached canonical templates, so their templates are only moved to the new initial
+        state rather than generated again.
+
+        Args:
+            previous (Manoeuvre): a manoeuvre created from the same ElDefs
+            changed (List[str]): the names of the ManParms that have changed since previous was created
+            itrans (Transformation): initial transformation, as in create
+
+        Returns:
+            Manoeuvre: The manoeuvre
+        """
+        update = self.eds.dependents(changed)
+        return Manoeuvre(
+            self.create_entry_line(itrans)(self.mps),
+            Elements([
+                ed(self.mps) if ed.name in update.data or not ed.name in previous.elements.data 
+                else previous.elements.data[ed.name] for ed in self.eds
+            ]), 
+            None,
+            uid=self.info.short_name
+        )
+
+    def variants(self, table: pd.DataFrame) -> dict[str, pd.DataFrame]:
+        """The element parameters for many variants of the ManParm defaults at once.
+
+        Args:
+            table (pd.DataFrame): a row for each variant and a column for each ManParm to vary,
+                see ManParms.variant_values
+
+        Returns:
+            dict[str, pd.DataFrame]: the parameters of each element (by ElDef name), with a row
+                for each variant
+        """
+        values = self.mps.variant_values(table)
+        return {ed.name: ed.evaluate(values, len(table)) for ed in self.eds}
+
+    def create_variants(self, table: pd.DataFrame) -> list[Manoeuvre]:
+        """Create the manoeuvre (without entry or exit lines, as _create) for each variant. 
+        The elements share the canonical template caches of the ElDefs, so variants that 
+        repeat an element only make its canonical template once."""
+        rows = {name: params.to_dict('records') for name, params in self.variants(table).items()}
+        return [Manoeuvre(
+            None,
+            Elements([ed.create(**rows[ed.name][i]) for ed in self.eds]),
+            None,
+            uid=self.info.name
+        ) for i in range(len(table))]
+
     def _create(self) -> Manoeuvre:
         return Manoeuvre(
             None,
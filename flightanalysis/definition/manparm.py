@@ -64,28 +64,36 @@ class ManParm(Opp):
         self.collectors.data[id] = collector
 
     def collect(self, els):
-        return {str(collector): collector(els) for collector in self.collectors}
-
-    def collect_vis(self, els, state: State) -> Tuple[Point, list[float]]:
-        vis = [[c.visibility(els, state) for c in collector.list_parms()] for collector in self.collectors]
-
-        return Point.concatenate([Point.concatenate([v[0] for v in vi]).mean() for vi in vis ]), [np.mean([v[1]for v in vi]) for vi in vis]
-
+        compiled = [collector.compile() for collector in self.collectors]
+        return {c.text: c(els) for c in compiled}
+
+    def collect_vis(self, els, state: State, cache: dict=None) -> Tuple[Point, list[float]]:
+        """The mean direction and visibility of the parameters used by each collector, see
+        Collector.visibility for the cache"""
+        cache = {} if cache is None else cache
+        parms = [collector.list_parms() for collector in self.collectors]
+        vis = [c.visibility(els, state, cache) for cparms in parms for c in cparms]
+        counts = np.array([len(cparms) for cparms in parms])
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        return (
+            Point(np.add.reduceat(Point.concatenate([v[0] for v in vis]).data, starts) / counts[:, None]),
+            list(np.add.reduceat(np.concatenate([np.ravel(v[1]) for v in vis]), starts) / counts)
+        )
 
-    def get_downgrades(self, els, state: State):
+    def measure(self, els, state: State, cache: dict=None) -> Tuple[list[str], Measurement]:
+        """The names of the collectors and a Measurement of the values they collect"""
         coll = self.collect(els)
-        values = list(coll.values())
-        direction, vis = self.collect_vis(els, state)
-
-        meas = Measurement(
-            values,
-            self.default,
-            direction,
-            vis
-        )
+        direction, vis = self.collect_vis(els, state, cache)
+        return list(coll.keys()), Measurement(list(coll.values()), self.default, direction, vis)
 
-        keys, errors, dgs = self.criteria(list(coll.keys()), list(coll.values())) 
-        return Result(self.name, meas, values, errors, dgs * meas.visibility, keys)
+    @staticmethod
+    def score(name: str, criteria: Criteria, ids: list[str], meas: Measurement) -> Result:
+        """Compare the collected values in a Measurement made by ManParm.measure"""
+        keys, errors, dgs = criteria(ids, meas.value) 
+        return Result(name, meas, meas.value, errors, dgs * meas.visibility, keys)
+
+    def get_downgrades(self, els, state: State, cache: dict=None):
+        return ManParm.score(self.name, self.criteria, *self.measure(els, state, cache))
 
     @property
     def value(self):
@@ -104,6 +112,13 @@ class ManParm(Opp):
     def copy(self):
         return ManParm(name=self.name, criteria=self.criteria, default=self.default, collectors=self.collectors.copy())
 
+    def with_default(self, default) -> Self:
+        """A ManParm with a new default sharing the criteria and collectors of self, or self
+        if the default is unchanged"""
+        if np.array_equal(default, self.default):
+            return self
+        return ManParm(self.name, self.criteria, default, self.collectors)
+
     def list_parms(self):
         return [self]
 
@@ -116,11 +131,19 @@ class ManParms(Collection):
     VType=ManParm
     uid="name"
 
+    def __setstate__(self, state):
+        # Collection.__getattr__ reads self.data, which does not exist until this has run
+        self.__dict__.update(state)
+
     def collect(self, manoeuvre: Manoeuvre, state: State=None) -> Results:
-        """Collect the comparison downgrades for each manparm for a given manoeuvre."""
+        """Collect the comparison downgrades for each manparm for a given manoeuvre. The element
+        slices of state and the visibility of each element parameter are found once and shared 
+        between the manparms."""
+        els = manoeuvre.all_elements()
+        cache = {}
         return Results(
             "Inter",
-            [mp.get_downgrades(manoeuvre.all_elements(), state) for mp in self if not isinstance(mp.criteria, Combination)]
+            [mp.get_downgrades(els, state, cache) for mp in self if not isinstance(mp.criteria, Combination)]
         )
     
     def append_collectors(self, colls: Dict[str, Callable]):
@@ -130,24 +153,61 @@ class ManParms(Collection):
 
     def update_defaults(self, intended: Manoeuvre) -> Self:
         """Pull the parameters from a manoeuvre object and update the defaults of self based on the result of 
-        the collectors.
+        the collectors. The ManParms whose defaults do not change are shared with self.
 
         Args:
             intended (Manoeuvre): Usually a Manoeuvre that has been resized based on an alinged state
         """
         mps = []
+        els = intended.all_elements()
         for mp in self:
-            flown_parm = list(mp.collect(intended.all_elements()).values())
+            flown_parm = list(mp.collect(els).values())
             if len(flown_parm) > 0 and mp.default is not None:
                 if isinstance(mp.criteria, Combination):
                     default = mp.criteria.check_option(flown_parm)
                 else:
                     default = np.mean(np.abs(flown_parm)) * np.sign(mp.default)
-                mps.append(ManParm(mp.name, mp.criteria, default, mp.collectors))
+                mps.append(mp.with_default(default))
             else: 
                 mps.append(mp)
         return ManParms(mps)
     
+    def variant_values(self, table: pd.DataFrame) -> dict[str, np.ndarray]:
+        """The value of each ManParm for every row of a table of variants, for
+        CompiledOpp.evaluate. The columns of table are ManParm names and hold the defaults
+        (option indices for Combinations), ManParms without a column keep their default. The
+        values of Combinations have a row of options for each variant.
+
+        Args:
+            table (pd.DataFrame): one row per variant
+
+        Returns:
+            dict[str, np.ndarray]: the values of each ManParm with a value
+        """
+        unknown = [c for c in table.columns if c not in self.data]
+        if len(unknown) > 0:
+            raise ValueError(f"{unknown} are not ManParms")
+        values = {}
+        for mp in self:
+            defaults = table[mp.name].to_numpy() if mp.name in table.columns else np.full(len(table), mp.default)
+            if isinstance(mp.criteria, Combination):
+                values[mp.name] = np.asarray(mp.criteria.desired)[defaults.astype(int)]
+            elif isinstance(mp.criteria, Comparison):
+                values[mp.name] = defaults
+        return values
+
+    def defaults_key(self) -> tuple:
+        """A hashable summary of the current defaults, used to cache things built from them"""
+        return tuple(
+            (mp.name, tuple(np.ravel(mp.default)) if pd.api.types.is_list_like(mp.default) else mp.default)
+            for mp in self
+        )
+
+    def changed(self, other: Self) -> list[str]:
+        """The names of the ManParms whose defaults differ from those in other"""
+        okey = dict(other.defaults_key())
+        return [k for k, v in self.defaults_key() if not k in okey or not np.all(okey[k] == v)]
+
     def remove_unused(self):
         return ManParms([mp for mp in self if len(mp.collectors) > 0])
 
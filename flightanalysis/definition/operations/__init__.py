@@ -1 +1,2 @@
-from .operation import Opp, MathOpp, FunOpp, ItemOpp
\ No newline at end of file
+from .operation import Opp, MathOpp, FunOpp, ItemOpp
+from .compiled import CompiledOpp
@@ -0,0 +1,86 @@
+"""Opp trees compiled to a single python expression.
+
+Evaluating an Opp by calling it walks the tree, making a get_vf wrapper for every constant on
+every call. Compiling it writes the tree out once as the source of a lambda, with the leaves
+(ManParm values, Combination items and Collector values) as its arguments and the constants
+bound as globals, so an evaluation is one call to a function built by python. The arithmetic
+is unchanged, so scalar results are identical to those of the tree, and as the expression only
+uses +, -, *, / and abs it also works on numpy arrays of parameter values.
+"""
+from __future__ import annotations
+import numpy as np
+from collections.abc import Mapping
+from typing import Any, Callable
+
+
+class OppCompiler:
+    """Collects the arguments and constants while an Opp tree writes out its source"""
+    def __init__(self):
+        self.slots: dict[str, tuple] = {}
+        self.leaves: list = []
+        self.constants: dict[str, Any] = {}
+
+    def slot(self, name: str, leaf, *spec) -> str:
+        """The argument for a leaf, spec is ('parm', mpname), ('item', mpname, item) or
+        ('collector', elname, pname)"""
+        if name not in self.slots:
+            self.slots[name] = spec
+            self.leaves.append(leaf)
+        return f"_a{list(self.slots).index(name)}"
+
+    def constant(self, value) -> str:
+        key = f"_c{len(self.constants)}"
+        self.constants[key] = value
+        return key
+
+    def source(self, arg) -> str:
+        from .operation import Opp
+        return arg._source(self) if isinstance(arg, Opp) else self.constant(arg)
+
+
+class CompiledOpp:
+    """A callable equivalent of an Opp, made by Opp.compile.
+        text (str): str of the Opp
+        source (str): the python expression
+        slots (dict[str, tuple]): what provides each argument, by its name in the Opp string
+        leaves (list[Opp]): the leaf Opp for each argument
+    """
+    def __init__(self, text: str, source: str, slots: dict[str, tuple], leaves: list, constants: dict[str, Any]):
+        self.text = text
+        self.source = source
+        self.slots = slots
+        self.leaves = leaves
+        self.constants = constants
+        self.fun: Callable = self._build()
+
+    def _build(self) -> Callable:
+        args = ", ".join(f"_a{i}" for i in range(len(self.slots)))
+        return eval(f"lambda {args}: {self.source}", {'abs': abs, **self.constants})
+
+    def __getstate__(self):
+        # the lambda cannot be pickled, it is rebuilt from the source
+        return {k: v for k, v in self.__dict__.items() if not k == 'fun'}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.fun = self._build()
+
+    def __call__(self, coll, **kwargs):
+        """Evaluate against a ManParms or Elements collection. The leaves are called as they
+        are when the Opp is called, so a ManParm leaf gives its own value."""
+        return self.fun(*[leaf(coll) for leaf in self.leaves])
+
+    def evaluate(self, values: Mapping[str, Any]):
+        """Evaluate with values for each ManParm (by name) or Collector (by elname.pname). Values
+        can be arrays, the values of Combination ManParms are indexed on their last axis, so many
+        parameter sets can be evaluated at once."""
+        return self.fun(*[
+            np.asarray(values[spec[1]])[..., spec[2]] if spec[0] == 'item' else values[name]
+            for name, spec in self.slots.items()
+        ])
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"CompiledOpp({self.text})"
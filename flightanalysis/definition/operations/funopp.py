@@ -23,31 +23,8 @@ class FunOpp(Opp):
     def __str__(self):
         return f"{self.opp}({str(self.a)})"
 
-    @staticmethod 
-    def parse_f(inp: str, parser, name=None):
-        for fun in FunOpp.funs:
-            if len(fun) >= len(inp) - 2:
-                continue
-            if fun == inp[:len(fun)]:
-                return FunOpp(
-                    name,
-                    Opp.parse_f(inp[len(fun)+1:-1], parser, name), 
-                    fun
-                )
-        raise ValueError(f"cannot read a FunOpp from the outside of {inp}")
-
-    @staticmethod 
-    def parse(inp: str, coll: Collection, name=None):
-        for fun in FunOpp.funs:
-            if len(fun) >= len(inp) - 2:
-                continue
-            if fun == inp[:len(fun)]:
-                return FunOpp(
-                    name,
-                    coll.VType.parse(inp[len(fun)+1:-1], coll), 
-                    fun
-                )
-        raise ValueError(f"cannot read a FunOpp from the outside of {inp}")
+    def _source(self, compiler) -> str:
+        return f"{self.opp}({compiler.source(self.a)})"
 
     def list_parms(self):
         if isinstance(self.a, Opp):
@@ -21,27 +21,8 @@ class ItemOpp(Opp):
     def __str__(self):
         return f"{self.a.name}[{self.item}]"
 
-    @staticmethod
-    def parse_f(inp: str, parser, name:str=None):
-        contents = inp.split("[")
-        if not len(contents) == 2:
-            raise ValueError
-        return ItemOpp(
-            name,
-            Opp.parse_f(contents[0], parser, name), 
-            int(contents[1][:-1])
-        )
-
-    @staticmethod
-    def parse(inp: str, coll: Collection, name:str=None):
-        contents = inp.split("[")
-        if not len(contents) == 2:
-            raise ValueError
-        return ItemOpp(
-            name,
-            coll.VType.parse(contents[0], coll), 
-            int(contents[1][:-1])
-        )
+    def _source(self, compiler) -> str:
+        return compiler.slot(str(self), self, 'item', self.a.name, self.item)
 
     def __abs__(self):
         return FunOpp(self.name, self, "abs")
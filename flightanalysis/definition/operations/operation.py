@@ -2,7 +2,6 @@ from __future__ import annotations
 from numbers import Number
 from flightdata import Collection
 from uuid import uuid1
-from ast import literal_eval
 from dataclasses import dataclass
 
 
@@ -12,6 +11,9 @@ class Opp:
     name: str
     
     def __getattr__(self, name):
+        if name.startswith("__"):
+            # so that protocols such as pickle's __setstate__ are not given None
+            raise AttributeError(name)
         if name == "name":
             self.name = uuid1() 
             return self.name
@@ -22,6 +24,20 @@ class Opp:
     def __call__(self, coll, **kwargs):
         return self.value
 
+    def compile(self) -> CompiledOpp:
+        """A flat callable equivalent of this Opp, see CompiledOpp. It is made the first time it 
+        is needed and kept on the Opp."""
+        if '_compiled' not in self.__dict__:
+            compiler = OppCompiler()
+            source = self._source(compiler)
+            self.__dict__['_compiled'] = CompiledOpp(
+                str(self), source, compiler.slots, compiler.leaves, compiler.constants
+            )
+        return self.__dict__['_compiled']
+
+    def _source(self, compiler: OppCompiler) -> str:
+        return compiler.slot(self.name, self, 'parm', self.name)
+
     def get_vf(self, arg):
         if isinstance(arg, Opp):
             return arg
@@ -70,41 +86,22 @@ class Opp:
 
     @staticmethod
     def parse_f(inp, parser, name=None):
-        """Parse a an Operation from a string"""
-        for test in [
-            lambda inp : float(inp),
-            lambda inp : FunOpp.parse_f(inp, parser, name),
-            lambda inp : MathOpp.parse_f(inp, parser, name),
-            lambda inp : ItemOpp.parse_f(inp, parser, name),
-            lambda inp : literal_eval(inp)
-        ]: 
-            try: 
-                return test(inp.strip(" "))
-            except ValueError:
-                continue
-        else:
-            return parser(inp)
+        """Parse a an Operation from a string, parser makes the leaves from their names and
+        every Opp is given name"""
+        if isinstance(inp, Number) or isinstance(inp, Opp):
+            return inp
+        return read(inp, parser, name, inherit=True)
 
     @staticmethod
     def parse(inp, coll:Collection, name=None):
-        """Parse a an Operation from a string
-        TODO move to the subclass and call parse_f"""
-        for test in [
-            lambda inp, mps : float(inp),
-            lambda inp, mps : FunOpp.parse(inp, coll, name),
-            lambda inp, mps : MathOpp.parse(inp, coll, name),
-            lambda inp, mps : ItemOpp.parse(inp, coll, name),
-            lambda inp, mps : literal_eval(inp)
-        ]:
-            if isinstance(inp, Number) or isinstance(inp, Opp):
-                return inp 
-            try: 
-                return test(inp.strip(" "), coll)
-            except ValueError:
-                continue
-        else:
-            return coll[inp]
-
+        """Parse a an Operation from a string, the leaves are taken from coll. The result is 
+        memoised against the coll, see operations.parser"""
+        if isinstance(inp, Number) or isinstance(inp, Opp):
+            return inp 
+        return parse(inp, coll, name)
+
+from .compiled import OppCompiler, CompiledOpp
+from .parser import read, parse
 from .mathopp import MathOpp
 from .funopp import FunOpp
 from .itemopp import ItemOpp
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""A single pass parser for the strings made by str(Opp).
+
+The string is tokenized once and read into a tree of tuples by recursive descent:
+    ('num', value), ('name', name), ('literal', string), ('item', tree, index),
+    ('fun', fun, tree) and ('math', opp, tree, tree)
+The trees are cached by string, so each distinct string is only read once. Building the Opps
+from a tree only looks up the leaves. Strings that are not Opp expressions (tuples, True etc)
+are read with literal_eval as before.
+"""
+from __future__ import annotations
+import re
+from ast import literal_eval
+from functools import lru_cache
+from weakref import WeakKeyDictionary
+from flightdata import Collection
+
+
+_token = re.compile(r"\s*(?:(\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)|([A-Za-z_][\w.]*)|(.))")
+_literals = {"True", "False", "None"}
+_funs = {"abs"}
+_opps = {"+", "-", "*", "/"}
+
+
+def tokenize(inp: str) -> list[tuple[str, str]]:
+    """Split a string into ('num', s), ('name', s) and ('sym', s) tokens"""
+    tokens = []
+    for num, name, sym in _token.findall(inp):
+        if num:
+            tokens.append(("num", num))
+        elif name:
+            tokens.append(("name", name))
+        elif not sym.isspace():
+            tokens.append(("sym", sym))
+    return tokens
+
+
+class _Reader:
+    def __init__(self, tokens: list[tuple[str, str]]):
+        self.tokens = tokens
+        self.i = 0
+
+    def peek(self):
+        return self.tokens[self.i] if self.i < len(self.tokens) else (None, None)
+
+    def take(self, kind: str = None, value: str = None) -> str:
+        k, v = self.peek()
+        if k is None or (kind is not None and k != kind) or (value is not None and v != value):
+            raise ValueError(f"unexpected {v} at token {self.i}")
+        self.i += 1
+        return v
+
+    def expression(self) -> tuple:
+        kind, value = self.peek()
+        if kind == "num":
+            tree = ("num", float(self.take()))
+        elif kind == "sym" and value == "-" and self.tokens[self.i + 1:self.i + 2] and self.tokens[self.i + 1][0] == "num":
+            self.take()
+            tree = ("num", -float(self.take()))
+        elif kind == "name" and value in _funs and self.tokens[self.i + 1:self.i + 2] == [("sym", "(")]:
+            self.take()
+            self.take("sym", "(")
+            tree = ("fun", value, self.expression())
+            self.take("sym", ")")
+        elif kind == "name":
+            self.take()
+            if value in _literals:
+                tree = ("literal", value)
+            else:
+                try:
+                    tree = ("num", float(value))  # inf, nan
+                except ValueError:
+                    tree = ("name", value)
+        elif kind == "sym" and value == "(":
+            self.take()
+            a = self.expression()
+            opp = self.take("sym")
+            if opp not in _opps:
+                raise ValueError(f"unknown operation {opp}")
+            tree = ("math", opp, a, self.expression())
+            self.take("sym", ")")
+        else:
+            raise ValueError(f"unexpected {value} at token {self.i}")
+
+        while self.peek() == ("sym", "["):
+            self.take()
+            sign = 1
+            if self.peek() == ("sym", "-"):
+                self.take()
+                sign = -1
+            tree = ("item", tree, sign * int(self.take("num")))
+            self.take("sym", "]")
+        return tree
+
+
+@lru_cache(maxsize=4096)
+def parse_tree(inp: str) -> tuple:
+    """Read a string into a tree, ('literal', inp) if it is not an Opp expression"""
+    try:
+        reader = _Reader(tokenize(inp))
+        tree = reader.expression()
+        if reader.i < len(reader.tokens):
+            raise ValueError("unexpected tokens after the expression")
+        return tree
+    except (ValueError, IndexError):
+        return ("literal", inp.strip(" "))
+
+
+def build(tree: tuple, leaf, name=None, inherit: bool=False):
+    """Make the Opp described by a tree. leaf is called with the name of each leaf. name is
+    given to the top Opp, and to the Opps inside it if inherit"""
+    from .mathopp import MathOpp
+    from .funopp import FunOpp
+    from .itemopp import ItemOpp
+    inner = name if inherit else None
+    kind = tree[0]
+    if kind == "num":
+        return tree[1]
+    elif kind == "name":
+        return leaf(tree[1])
+    elif kind == "literal":
+        return literal_eval(tree[1])
+    elif kind == "item":
+        return ItemOpp(name, build(tree[1], leaf, inner, inherit), tree[2])
+    elif kind == "fun":
+        return FunOpp(name, build(tree[2], leaf, inner, inherit), tree[1])
+    else:
+        return MathOpp(name, build(tree[2], leaf, inner, inherit), build(tree[3], leaf, inner, inherit), tree[1])
+
+
+def read(inp: str, leaf, name=None, inherit: bool=False):
+    """Read a string into an Opp (see build), or a literal if it is not an Opp expression. A
+    string that is neither is passed to leaf."""
+    tree = parse_tree(inp)
+    if tree[0] == "literal":
+        try:
+            return literal_eval(tree[1])
+        except ValueError:
+            return leaf(inp)
+    return build(tree, leaf, name, inherit)
+
+
+_memo: WeakKeyDictionary[Collection, dict] = WeakKeyDictionary()
+
+
+def parse(inp: str, coll: Collection, name=None):
+    """Parse a string against a collection (usually ManParms) whose items are the leaves. The
+    result is memoised against the collection and the (string, name) pair, so parsing the same
+    string again (for example the props of repeated ElDefs) returns the same Opp. The memo
+    holds the leaves it was built from and is only used while they are still the items of
+    coll, so replacing an item (e.g. with coll.add) gives a new Opp. Literals are not memoised
+    as they may be mutable."""
+    memo = _memo.setdefault(coll, {})
+    key = (inp, name)
+    if key in memo:
+        opp, leaves = memo[key]
+        if all(coll.data.get(k) is v for k, v in leaves.items()):
+            return opp
+    if parse_tree(inp)[0] == "literal":
+        return read(inp, coll.__getitem__)
+    leaves = {}
+    def leaf(k):
+        leaves[k] = coll[k]
+        return leaves[k]
+    opp = read(inp, leaf, name)
+    memo[key] = (opp, leaves)
+    return opp
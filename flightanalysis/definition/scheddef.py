@@ -8,8 +8,10 @@ from flightdata import Collection, State
 from json import dump, load
 from flightdata.base.numpy_encoder import NumpyEncoder
 from dataclasses import dataclass
-from flightanalysis.data import list_resources, get_json_resource
+from flightanalysis.data import list_resources, get_json_resource, get_resource_path
+from .library import TemplateLibrary
 from json import dump
+from collections.abc import MutableMapping
 
 @dataclass
 class ScheduleInfo:
@@ -44,8 +46,71 @@ class ScheduleInfo:
 schedule_library = [ScheduleInfo.from_str(fname) for fname in list_resources('schedule')]
 
 
+class ManDefs(MutableMapping):
+    """The data of a SchedDef read from a file. The manoeuvre definitions are held as the
+    dicts they were read from and a ManDef is only built (and the template library applied
+    to it) the first time it is accessed. The ManInfos can be read without building anything.
+    """
+    def __init__(self, data: dict[str, Union[dict, ManDef]], library: TemplateLibrary=None):
+        self._items = data
+        self._infos: dict[str, ManInfo] = {}
+        self.library = library
+
+    def __getitem__(self, key: str) -> ManDef:
+        value = self._items[key]
+        if isinstance(value, dict):
+            value = ManDef.from_dict(value)
+            if self.library is not None:
+                self.library.apply([value])
+            self._items[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: ManDef):
+        self._items[key] = value
+        self._infos.pop(key, None)
+
+    def __delitem__(self, key: str):
+        del self._items[key]
+        self._infos.pop(key, None)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def info(self, key: str) -> ManInfo:
+        value = self._items[key]
+        if not isinstance(value, dict):
+            return value.info
+        if key not in self._infos:
+            self._infos[key] = ManInfo.from_dict(value["info"])
+        return self._infos[key]
+
+    def copy(self) -> dict[str, ManDef]:
+        return dict(self)
+
+    def built(self) -> list[str]:
+        """The names of the manoeuvres that have been built"""
+        return [k for k, v in self._items.items() if not isinstance(v, dict)]
+
+
 class SchedDef(Collection):
     VType=ManDef
+
+    def __getitem__(self, key):
+        if isinstance(key, int) and isinstance(self.data, ManDefs):
+            return self.data[list(self.data)[key]]
+        return super().__getitem__(key)
+
+    @property
+    def infos(self) -> list[ManInfo]:
+        """The ManInfo of each manoeuvre, without building the ManDefs if they were loaded
+        from a file"""
+        if isinstance(self.data, ManDefs):
+            return [self.data.info(k) for k in self.data]
+        return [md.info for md in self]
+
     def add_new_manoeuvre(self, info: ManInfo, defaults=None):
         return self.add(ManDef(info,defaults))
 
@@ -85,6 +150,18 @@ class SchedDef(Collection):
             dump(self.to_dict(), f, cls=NumpyEncoder, indent=2)
         return file
 
+    @classmethod
+    def from_dict(Cls, data: dict[str, dict], library: TemplateLibrary=None) -> Self:
+        """Read a schedule definition. The ManDefs are built as they are accessed, see ManDefs.
+
+        Args:
+            data (dict[str, dict]): the ManDef dicts, as written by to_dict
+            library (TemplateLibrary, optional): applied to each ManDef as it is built.
+        """
+        sdef = Cls()
+        sdef.data = ManDefs({v["info"]["short_name"]: v for v in data.values()}, library)
+        return sdef
+
     @staticmethod
     def from_json(file:str):
         with open(file, "r") as f:
@@ -92,9 +169,26 @@ class SchedDef(Collection):
         
     @staticmethod
     def load(name: Union[str,ScheduleInfo]) -> Self:
+        """Load a schedule definition from the package data. If a precompiled template 
+        library has been built for the schedule the template caches are populated from it."""
         sinfo = ScheduleInfo.from_str(name) if isinstance(name, str) else name 
             
-        return SchedDef.from_dict(get_json_resource(f"{str(sinfo).lower()}_schedule"))
+        return SchedDef.from_dict(
+            get_json_resource(f"{str(sinfo).lower()}_schedule"),
+            TemplateLibrary.load(SchedDef.library_path(sinfo))
+        )
+
+    @staticmethod
+    def library_path(sinfo: ScheduleInfo):
+        return get_resource_path(f"{str(sinfo).lower()}_templates")
+
+    def build_library(self, name: Union[str, ScheduleInfo]) -> TemplateLibrary:
+        """Precompile the default templates for this schedule and write them next to the 
+        schedule definition in the package data."""
+        sinfo = ScheduleInfo.from_str(name) if isinstance(name, str) else name
+        library = TemplateLibrary.build(self)
+        library.save(SchedDef.library_path(sinfo))
+        return library
     
 
     def plot(self):
@@ -137,7 +231,7 @@ class SchedDef(Collection):
             template=template.mirror_zy()
 
         fcj = self.label_exit_lines(template).create_fc_json(
-            [0] + [man.info.k for man in self] + [0],
+            [0] + [info.k for info in self.infos] + [0],
             sname,
             kind
         )
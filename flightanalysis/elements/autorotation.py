@@ -12,13 +12,13 @@ class Autorotation(Element):
     """much like a line, but rolls happens around the velocity vector,
     rather than the body x axis"""
     parameters = Element.parameters + "length,roll,rate,angle".split(",")
+    constant_rate = True
     def __init__(self, speed: float, length: float, roll: float, uid: str):
         super().__init__(uid, speed)
         self.length = length
         self.roll = roll
         
-    @property
-    def intra_scoring(self):
+    def build_intra_scoring(self) -> DownGrades:
         '''TODO check the motion looks like a snap
         check the right number of turns was performed'''
         return DownGrades()
@@ -31,6 +31,10 @@ class Autorotation(Element):
     @property
     def rate(self):
         return self.angle * self.speed / self.length
+
+    @property
+    def duration(self):
+        return self.length / self.speed
     
     def create_template(self, istate: State, time: Time=None):
         
@@ -38,7 +42,7 @@ class Autorotation(Element):
             vel=istate.vel.scale(self.speed),
             rvel=P0()
         ).fill(
-            Element.create_time(self.length / self.speed, time)
+            Element.create_time(self.duration, time)
         ).superimpose_rotation(
             istate.vel.unit(),
             self.angle
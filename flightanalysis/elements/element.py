@@ -12,12 +12,30 @@ from typing import Self, Tuple
 
 class Element:   
     parameters = ["speed"]
+    constant_rate = False # True if the template is a rigid transform of one generated at the origin
+    canonical_freq = 120 # sample rate of the canonical template used for resampling
+    _registry: dict[str, type[Element]] = {} # element classes by lower case name
+    _init_args: tuple[str] = ("uid", "speed")
+
+    def __init_subclass__(cls, **kwargs):
+        """Register the subclass by name and store its constructor arguments, so they are
+        not inspected every time an element is built, copied or printed."""
+        super().__init_subclass__(**kwargs)
+        Element._registry[cls.__name__.lower()] = cls
+        cls._init_args = tuple(inspect.getfullargspec(cls.__init__).args[1:])
+
+    @classmethod
+    def init_args(Cls) -> tuple[str]:
+        """The names of the constructor arguments (excluding self)"""
+        return Cls._init_args
 
     def __init__(self, uid: str, speed: float):        
         self.uid = uid
         if speed < 0:
             raise ValueError("negative speeds are not allowed")
         self.speed = speed
+        self._canonical = {}
+        self._scoring = {}
 
     def get_data(self, st: State):
         return st.get_element(self.uid)
@@ -35,7 +53,7 @@ class Element:
         return np.all([np.isclose(getattr(self, p), getattr(other, p), 0.01) for p in self.__class__.parameters])
 
     def __repr__(self):
-        args = ['uid'] + inspect.getfullargspec(self.__init__).args[1:-1]
+        args = ['uid'] + list(self._init_args[:-1])
         return f'{self.__class__.__name__}({", ".join([str(getattr(self,a)) for a in args])})'
 
     def to_dict(self, exit_only: bool=False):
@@ -47,13 +65,17 @@ class Element:
         )
 
     def set_parms(self, **parms):
+        """A copy of the element with some parameters changed. If none of them change self is 
+        returned, so the element (and its cached templates and scoring) is shared."""
         kwargs = {k:v for k, v in self.__dict__.items() if not k[0] == "_"}
 
+        changed = False
         for key, value in parms.items():
             if key in kwargs:
+                changed = changed or not np.array_equal(kwargs[key], value)
                 kwargs[key] = value
         
-        return self.__class__(**kwargs)
+        return self.__class__(**kwargs) if changed else self
 
     def score_series_builder(self, index):
         return lambda data: pd.Series(data, index=index)
@@ -83,12 +105,26 @@ class Element:
             #probably want to extend by one timestep
             return time.reset_zero().scale(duration)
 
+    def _scoring_plan(self, kind: str) -> DownGrades:
+        """The DownGrades for kind ('intra' or 'exit'), built once and reused until the 
+        parameters change."""
+        key = tuple(getattr(self, p) for p in self.parameters)
+        if kind not in self._scoring or not self._scoring[kind][0] == key:
+            self._scoring[kind] = (key, getattr(self, f'build_{kind}_scoring')())
+        return self._scoring[kind][1]
+
     @property
     def intra_scoring(self) -> DownGrades:
-        return DownGrades()
+        return self._scoring_plan('intra')
 
     @property
-    def exit_scoring(self):
+    def exit_scoring(self) -> DownGrades:
+        return self._scoring_plan('exit')
+
+    def build_intra_scoring(self) -> DownGrades:
+        return DownGrades()
+
+    def build_exit_scoring(self) -> DownGrades:
         return DownGrades([
             DownGrade(Measurement.track_y, F3A.single.track),
             DownGrade(Measurement.track_z, F3A.single.track),
@@ -97,18 +133,16 @@ class Element:
 
     @classmethod
     def from_name(Cls, name) -> Element:
-        for Child in Cls.__subclasses__():
-            if Child.__name__.lower() == name.lower():
-                return Child
+        Child = Element._registry.get(name.lower())
+        if Child is not None and Child is not Cls and issubclass(Child, Cls):
+            return Child
 
     @classmethod
     def from_dict(Cls, data: dict):
         El = Element.from_name(data["kind"].lower())
-        
-        _args = inspect.getfullargspec(El.__init__)[0]
 
         return El(
-            **{k: v for k, v in data.items() if k in _args}
+            **{k: v for k, v in data.items() if k in El._init_args}
         )
     
     @classmethod
@@ -118,7 +152,7 @@ class Element:
 
     def copy(self):
         return self.__class__(
-            **{p: getattr(self, p) for p in inspect.getfullargspec(self.__init__).args[1:]}
+            **{p: getattr(self, p) for p in self._init_args}
         )
     
     def length_visibility(self, st: State):
@@ -135,6 +169,75 @@ class Element:
     def create_template(self, istate: State, time: Time=None) -> State:
         raise Exception('Not available on base class')
 
+    @property
+    def duration(self) -> float:
+        raise Exception('Not available on base class')
+
+    @staticmethod
+    def vel_key(vel: g.Point) -> tuple[float]:
+        """The initial body velocity used to key the canonical templates. It is rounded (to
+        1e-6 m/s) so that float noise in the velocity of a state does not add entries."""
+        return tuple(float(v) for v in np.round(vel.data[0], 6) + 0.0)
+
+    def canonical_template(self, vel: g.Point) -> State:
+        """A high resolution template created at the origin, for an initial body velocity of vel.
+        Cached on the element against the parameter values and the initial velocity, the template
+        is created with the rounded velocity of the key (see vel_key)."""
+        vkey = Element.vel_key(vel)
+        key = (tuple(getattr(self, p) for p in self.parameters), vkey)
+        if key not in self._canonical:
+            n = max(int(np.ceil(self.duration * self.canonical_freq)), 3)
+            self._canonical[key] = self.create_template(
+                State.from_transform(g.Transformation(), vel=g.Point(*vkey)),
+                Time.from_t(np.linspace(0, self.duration, n))
+            )
+        return self._canonical[key]
+
+    def resample_template(self, istate: State, time: Time=None) -> State:
+        """Create a template on the time grid requested by interpolating the canonical template
+        rather than generating a new one. Positions and velocities are interpolated linearly, 
+        attitudes with slerp. Elements that are not constant rate fall back to create_template.
+
+        The geometry comes from the 120Hz canonical template, so it does not depend on the
+        requested grid. This is not identical to create_template on the same grid, which
+        integrates the rates at the grid spacing. For a Line the two agree. For a Loop on a coarse
+        grid, create_template drifts off the circle (by about 1m at 25Hz for a 50m loop), while the
+        resampled template stays within ~0.1m of it. Compared with creating the templates
+        directly, this moves matched template positions by up to ~0.7m and changes loop radius
+        inter scores slightly (~1e-4).
+
+        Args:
+            istate (State): initial state, as in create_template
+            time (Time, optional): the time grid, scaled to the element duration. Defaults to None.
+
+        Returns:
+            State: the template
+        """
+        if time is None or not self.constant_rate:
+            return self.create_template(istate, time)
+        
+        istate = istate[-1]
+        canonical = self.canonical_template(istate.vel)
+        time = Element.create_time(canonical.t[-1], time)
+
+        tc = canonical.t
+        i = np.clip(np.searchsorted(tc, time.t, side='right') - 1, 0, len(tc) - 2)
+        fac = np.clip((time.t - tc[i]) / (tc[i+1] - tc[i]), 0, 1)
+
+        def lerp(p: g.Point):
+            return p[i] + (p[i+1] - p[i]) * fac
+
+        att0, att1 = canonical.att[i], canonical.att[i+1]
+        att = att0.body_rotate(g.Quaternion.body_axis_rates(att0, att1) * fac)
+
+        return State.from_constructs(
+            time,
+            istate.att.transform_point(lerp(canonical.pos)) + istate.pos,
+            istate.att * att,
+            lerp(canonical.vel),
+            lerp(canonical.rvel)
+        ).label(element=self.uid)
+
     def match_intention(self, itrans: g.Transformation, flown: State) -> Self:
         raise Exception('Not available on base class')
 
@@ -10,14 +10,14 @@ from flightanalysis.scoring import Measurement, DownGrade, DownGrades
 
 class Line(Element):
     parameters = Element.parameters + "length,roll,rate".split(",")
+    constant_rate = True
 
     def __init__(self, speed, length, roll=0, uid:str=None):
         super().__init__(uid, speed)
         self.length = length
         self.roll = roll
     
-    @property
-    def intra_scoring(self) -> DownGrades:
+    def build_intra_scoring(self) -> DownGrades:
         _intra_scoring = DownGrades([
             DownGrade(Measurement.speed, F3A.intra.speed),
             DownGrade(Measurement.track_y, F3A.intra.track),
@@ -39,6 +39,10 @@ class Line(Element):
     def rate(self):
         return self.roll * self.speed / self.length
 
+    @property
+    def duration(self):
+        return self.length / self.speed
+
     def create_template(self, istate: State, time: Time=None) -> State:
         """construct a State representing the judging frame for this line element
 
@@ -54,7 +58,7 @@ class Line(Element):
              
         return self._add_rolls(
             istate.copy(vel=v, rvel=P0()).fill(
-                Element.create_time(self.length / self.speed, time)
+                Element.create_time(self.duration, time)
             ), 
             self.roll
         )
@@ -4,12 +4,13 @@ from geometry import Transformation, Coord, Point, PX, PY, PZ
 from typing import Union
 from flightdata import State, Time
 from flightanalysis.scoring.criteria.f3a_criteria import F3A
-from flightanalysis.scoring import Measurement, DownGrade, DownGrades
+from flightanalysis.scoring import Measurement, Measure, DownGrade, DownGrades
 from . import Element
 from numbers import Number
 
 class Loop(Element):
     parameters = Element.parameters + "radius,angle,roll,ke,rate".split(",")
+    constant_rate = True
 
     def __init__(self, speed: float, radius: float, angle: float, roll:float=0.0, ke: Union[bool, Number] = False, uid: str=None):
         '''Create a loop element
@@ -25,23 +26,15 @@ class Loop(Element):
             ke = np.pi/2 if ke else 0
         self.ke = ke
 
-    @property
-    def intra_scoring(self) -> DownGrades:
+    def build_intra_scoring(self) -> DownGrades:
         proj = Point(0, np.cos(self.ke), np.sin(self.ke))
-        def track_y(fl, tp):
-            return Measurement.track_proj(fl, tp, proj, fix='vel')
-        def track_z(fl, tp):
-            return Measurement.track_proj(fl, tp, proj, fix='ang')
-        def radius(fl, tp):
-            return Measurement.radius(fl, tp, proj)
         _intra_scoring = DownGrades([
             DownGrade(Measurement.speed, F3A.intra.speed),
-            DownGrade(radius, F3A.intra.radius),
-            DownGrade(track_y, F3A.intra.track),
-            DownGrade(track_z, F3A.single.track),
+            DownGrade(Measure('radius', 'radius', dict(proj=proj)), F3A.intra.radius),
+            DownGrade(Measure('track_y', 'track_proj', dict(proj=proj, fix='vel')), F3A.intra.track),
+            DownGrade(Measure('track_z', 'track_proj', dict(proj=proj, fix='ang')), F3A.single.track),
         ])
-        def roll_angle(fl, tp):
-            return Measurement.roll_angle_proj(fl, tp, Point(0, np.cos(self.ke), np.sin(self.ke)))
+        roll_angle = Measure('roll_angle', 'roll_angle_proj', dict(proj=proj))
 
         if not self.roll == 0:
             _intra_scoring.add(DownGrade(Measurement.roll_rate, F3A.intra.roll_rate))
@@ -62,6 +55,10 @@ class Loop(Element):
     def rate(self):
         return self.roll * self.speed / (self.angle * self.radius)
 
+    @property
+    def duration(self):
+        return self.radius * abs(self.angle) / self.speed
+
     def create_template(self, istate: State, time: Time=None) -> State:
         """Generate a template loop. 
 
@@ -71,7 +68,7 @@ class Loop(Element):
         Returns:
             [State]: flight data representing the loop
         """
-        duration = self.radius * abs(self.angle) / self.speed
+        duration = self.duration
         
         if self.angle == 0:
             raise NotImplementedError()      
@@ -5,7 +5,7 @@ from flightdata import State, Time
 from .element import Element
 from .loop import Loop
 from flightanalysis.scoring.criteria.f3a_criteria import F3A
-from flightanalysis.scoring import Measurement, DownGrade, DownGrades
+from flightanalysis.scoring import Measurement, Measure, DownGrade, DownGrades
 
 
 class NoseDrop(Element):
@@ -18,15 +18,16 @@ class NoseDrop(Element):
         self.radius=radius
         self.break_angle = break_angle
 
-    @property
-    def intra_scoring(self) -> DownGrades:
+    def build_intra_scoring(self) -> DownGrades:
         '''TODO check alpha is increasing'''
-        def length(fl, tp):
-            return Measurement.length(fl, tp, PX())
         return DownGrades([
-            DownGrade(length, F3A.intra.spin_entry_length)
+            DownGrade(Measure('length', 'length', dict(direction=PX())), F3A.intra.spin_entry_length)
         ])
 
+    @property
+    def duration(self):
+        return self.radius * np.pi / (2 * self.speed)
+
     def create_template(self, istate: State, time: Time=None) -> State:
         _inverted = 1 if istate.transform.rotation.is_inverted()[0] else -1
         
@@ -62,6 +63,5 @@ class NoseDrop(Element):
         return self.set_parms(break_angle=abs(self.break_angle) * np.sign(other.break_angle))
 
 
-    @property
-    def exit_scoring(self) -> DownGrades:
+    def build_exit_scoring(self) -> DownGrades:
         return DownGrades()
@@ -4,31 +4,31 @@ from geometry import Transformation, PX, PY, PZ
 from flightdata import State, Time
 from .element import Element
 from flightanalysis.scoring.criteria.f3a_criteria import F3A
-from flightanalysis.scoring import Measurement, DownGrade, DownGrades
+from flightanalysis.scoring import Measurement, Measure, DownGrade, DownGrades
 from .line import Line
 
 
 class PitchBreak(Element):
     parameters = Element.parameters + "length,break_angle".split(",")
+    constant_rate = True
     def __init__(self, speed: float, length: float, break_angle: float, uid: str=None):
         super().__init__(uid, speed)
         self.length=length
         self.break_angle = break_angle
 
-    @property
-    def intra_scoring(self) -> DownGrades:
+    def build_intra_scoring(self) -> DownGrades:
         '''TODO check the pitch departure is in the right direction
         TODO perhaps limit the roll amount'''
-        def length(fl, tp):
-            return Measurement.length(fl, tp, PX())
         return DownGrades([
-            DownGrade(length, F3A.intra.pitch_break_length),
+            DownGrade(Measure('length', 'length', dict(direction=PX())), F3A.intra.pitch_break_length),
         ])
 
-    @property
-    def exit_scoring(self) -> DownGrades:
+    def build_exit_scoring(self) -> DownGrades:
         return DownGrades()
 
+    @property
+    def duration(self):
+        return self.length / self.speed
 
     def create_template(self, istate: State, time: Time=None) -> State:
         return Line(self.speed, self.length).create_template(
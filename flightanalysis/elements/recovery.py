@@ -5,27 +5,29 @@ from flightdata import State, Time
 from .element import Element
 from .line import Line
 from flightanalysis.scoring.criteria.f3a_criteria import F3A
-from flightanalysis.scoring import Measurement, DownGrade, DownGrades
+from flightanalysis.scoring import Measurement, Measure, DownGrade, DownGrades
 
 
 class Recovery(Element):
     parameters = Element.parameters + ["length"]
+    constant_rate = True
     def __init__(self, speed, length, uid: str=None):
         super().__init__(uid, speed)
         self.length = length
 
-    @property
-    def intra_scoring(self) -> DownGrades:
+    def build_intra_scoring(self) -> DownGrades:
         '''TODO perhaps limit the roll amount'''
-        def length(fl, tp):
-            return Measurement.length(fl, tp, PX())
         return DownGrades([
             DownGrade(Measurement.track_z, F3A.single.track),
             DownGrade(Measurement.track_y, F3A.single.track),
-            DownGrade(length, F3A.intra.recovery_length),
+            DownGrade(Measure('length', 'length', dict(direction=PX())), F3A.intra.recovery_length),
             DownGrade(Measurement.roll_angle, F3A.single.roll)
         ])
 
+    @property
+    def duration(self):
+        return self.length / self.speed
+
     def create_template(self, istate: State, time: Time=None) -> State:
         return Line(self.speed, self.length).create_template(
             istate, 
@@ -48,6 +50,5 @@ class Recovery(Element):
     def copy_direction(self, other: Recovery) -> Recovery:
         return self.set_parms()
 
-    @property
-    def exit_scoring(self) -> DownGrades:
+    def build_exit_scoring(self) -> DownGrades:
         return DownGrades()
@@ -4,36 +4,34 @@ import geometry as g
 from flightdata import State, Time
 from .element import Element
 from flightanalysis.scoring.criteria.f3a_criteria import F3A
-from flightanalysis.scoring import Measurement, DownGrade, DownGrades
+from flightanalysis.scoring import Measurement, Measure, DownGrade, DownGrades
 
 
 class StallTurn(Element):
     parameters = Element.parameters + ["yaw_rate"]
+    constant_rate = True
     def __init__(self, speed:float, yaw_rate:float=3.0, uid: str=None):
         super().__init__(uid, speed)
         self.yaw_rate = yaw_rate
 
-    @property
-    def intra_scoring(self) -> DownGrades:
-        def width(fl, tp):
-            return Measurement.length(fl, tp, g.PY())
-        def speed(fl, tp):
-            return Measurement.speed(fl, tp, g.PZ(), 'world')
-        def roll_angle(fl, tp):
-            return Measurement.roll_angle_z(fl, tp)
+    def build_intra_scoring(self) -> DownGrades:
         return DownGrades([
-            DownGrade(roll_angle, F3A.intra.roll),
-            DownGrade(width, F3A.intra.stallturn_width),
-            DownGrade(speed, F3A.intra.stallturn_speed),
+            DownGrade(Measure('roll_angle', 'roll_angle_z'), F3A.intra.roll),
+            DownGrade(Measure('width', 'length', dict(direction=g.PY())), F3A.intra.stallturn_width),
+            DownGrade(Measure('speed', 'speed', dict(direction=g.PZ(), axis='world')), F3A.intra.stallturn_speed),
         ])
 
     def describe(self):
         return f"stallturn, yaw rate = {self.yaw_rate}"
 
+    @property
+    def duration(self):
+        return np.pi / abs(self.yaw_rate)
+
     def create_template(self, istate: State, time: Time=None) -> State:
         return self._add_rolls(
             istate.copy(rvel=g.P0() ,vel=g.P0()).fill( 
-                Element.create_time(np.pi / abs(self.yaw_rate), time)
+                Element.create_time(self.duration, time)
             ).superimpose_rotation(
                 g.PZ(), 
                 np.sign(self.yaw_rate) * np.pi
@@ -8,6 +8,7 @@ from dataclasses import dataclass
 from flightdata.state import State
 from flightanalysis.elements import Elements, Element, Line, Autorotation
 from flightanalysis.scoring import *
+from flightanalysis.template import LazyTemplate
 
 
 @dataclass
@@ -74,8 +75,12 @@ class Manoeuvre:
             self.uid
         )
     
-    def create_template(self, initial: Union[Transformation, State], aligned:State=None) -> State:
-        
+    def create_template(self, initial: Union[Transformation, State], aligned:State=None, lazy: bool=False, resample: bool=False) -> Union[State, LazyTemplate]:
+        """Create the template for this manoeuvre. If lazy a LazyTemplate is returned, which 
+        only stacks the element templates as columns are requested (the element templates
+        themselves are always created here). If resample the element templates on the aligned 
+        time grid are interpolated from their canonical templates (see Element.resample_template),
+        which is quicker but does not give identical scores."""
         istate = State.from_transform(initial, vel=PX()) if isinstance(initial, Transformation) else initial
         aligned = self.get_data(aligned) if aligned else None
         templates = []
@@ -85,9 +90,13 @@ class Manoeuvre:
 
             if i < len(els)-1 and not time is None:
                 time = time.extend()
-            templates.append(element.create_template(istate, time))
+            templates.append(
+                element.resample_template(istate, time) if resample else element.create_template(istate, time)
+            )
             istate = templates[-1][-1]
         
+        if lazy:
+            return LazyTemplate(templates, dict(manoeuvre=self.uid))
         return State.stack(templates).label(manoeuvre=self.uid)
 
 
@@ -120,13 +129,15 @@ class Manoeuvre:
                     
         return Manoeuvre.from_all_elements(self.uid, elms), State.stack(templates[1:]).label(manoeuvre=self.uid)
 
-    def el_matched_tp(self, istate: State, aligned: State) -> State:
+    def el_matched_tp(self, istate: State, aligned: State, resample: bool=False) -> State:
+        """The template of each element relocated to the start of the flown element, resample as
+        in create_template"""
         els = self.all_elements()
         aligned= self.get_data(aligned)
         templates = [istate]
         for i, el in enumerate(els):
             st = el.get_data(aligned)
-            templates.append(el.create_template(
+            templates.append((el.resample_template if resample else el.create_template)(
                 templates[-1][-1].relocate(st[0].pos), 
                 st.time.extend() if i < len(els) - 1 else st.time
             ))
@@ -136,22 +147,31 @@ class Manoeuvre:
         return Manoeuvre.from_all_elements(self.uid, self.all_elements().copy(deep=True))
 
     def copy_directions(self, other: Manoeuvre) -> Self:
-        return Manoeuvre.from_all_elements(
-            self.uid, 
-            Elements(self.all_elements().copy_directions(other.all_elements()))
-        )
-
-    def analyse(self, flown: State, template: State):
+        """Take the directions of the elements of other. Unchanged elements are shared and self
+        is returned if none of them change."""
+        els = self.all_elements()
+        new_els = els.copy_directions(other.all_elements())
+        if all(a is b for a, b in zip(new_els, els)):
+            return self
+        return Manoeuvre.from_all_elements(self.uid, new_els)
+
+    def measure(self, flown: State, template: State, scorer: BatchScorer):
+        """Add the exit downgrades of the entry line and the intra downgrades of each element 
+        to a BatchScorer"""
         fl=self.entry_line.get_data(flown)
         tp=self.entry_line.get_data(template).relocate(fl.pos[0])
-        
-        ers = [Results(self.entry_line.uid, self.entry_line.analyse_exit(fl, tp))]
+        scorer.add(self.entry_line.uid, self.entry_line.exit_scoring, fl, tp)
 
         for el in self.elements:
             fl = el.get_data(flown)
             tp = el.get_data(template).relocate(fl.pos[0])
-            ers.append(Results(el.uid, el.analyse(fl, tp)))
-        return ElementsResults(ers)
+            scorer.add(el.uid, el.intra_scoring, fl, tp)
+
+    def analyse(self, flown: State, template: State, dtype=np.float64) -> ElementsResults:
+        """Score the intra downgrades, dtype=np.float32 for the single precision mode of BatchScorer"""
+        scorer = BatchScorer(dtype)
+        self.measure(flown, template, scorer)
+        return ElementsResults(scorer.evaluate())
 
     def optimise_alignment(self, istate: State, aligned: State) -> Tuple(Self, State):
         els = self.all_elements()
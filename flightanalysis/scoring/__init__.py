@@ -1,8 +1,8 @@
 from .results import Result, Results
-from .measurement import Measurement
+from .measurement import Measurement, Kinematics, Visibility
 from .results import Result, Results, ElementsResults, ManoeuvreResults
 from .criteria import *
-from .downgrade import DownGrade, DownGrades
+from .downgrade import Measure, DownGrade, DownGrades, BatchScorer
 
 
 
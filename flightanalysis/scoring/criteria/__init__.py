@@ -1,7 +1,7 @@
 from .exponential import Exponential, free
-from .criteria import Criteria
+from .criteria import Criteria, ragged
 from .intra.single import Single
-from .intra.continuous import ContAbs, ContRat
+from .intra.continuous import Continuous, ContAbs, ContRat
 from .intra.bounded import MaxBound, MinBound, InsideBound, OutsideBound, Bounded
 from .inter.comparison import Comparison
 from .inter.combination import Combination
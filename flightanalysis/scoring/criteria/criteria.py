@@ -1,4 +1,6 @@
+from __future__ import annotations
 import numpy as np
+import numpy.typing as npt
 from .exponential import Exponential, free
 from dataclasses import dataclass, field
 
@@ -35,12 +37,29 @@ class Criteria:
                 return Crit(lookup=Exponential(**lookup), **data)
         raise ValueError(f'cannot parse Criteria from {data}')
     
+    def batch(self, names: list[str], ms: list) -> list:
+        """Evaluate a list of Measurements against this criteria, returning a Result for each.
+        Subclasses evaluate the measurements together in one pass over the concatenated values, 
+        this falls back to calling each in turn."""
+        return [self(name, m) for name, m in zip(names, ms)]
+    
     def to_py(self):
         _so = f"{self.__class__.__name__}(Exponential({self.lookup.factor},{self.lookup.exponent}, {self.lookup.limit} )"
         if hasattr(self, 'bound'):
             _so = f"{_so}, {self.bound}"
         return _so + ')'
         
+def ragged(arrays: list[npt.NDArray]) -> tuple[npt.NDArray, npt.NDArray]:
+    """Concatenate a list of arrays.
+
+    Returns:
+        tuple[npt.NDArray, npt.NDArray]: the concatenated array and the offset of each 
+            array within it, with the total length appended
+    """
+    offsets = np.concatenate([[0], np.cumsum([len(arr) for arr in arrays])]).astype(int)
+    return np.concatenate(arrays), offsets
+
+
 @dataclass
 class CriteriaRes:
     pass
\ No newline at end of file
@@ -8,8 +8,11 @@ class Exponential:
     exponent: float
     limit: float = field(default=10)
     def __call__(self, value):
-        val = self.factor * value ** self.exponent
-        return np.minimum(val, self.limit)
+        # the parameters take the dtype of value so that float32 values are not promoted to float64
+        dtype = np.asarray(value).dtype
+        dtype = dtype if np.issubdtype(dtype, np.floating) else np.float64
+        val = np.asarray(self.factor, dtype=dtype) * value ** np.asarray(self.exponent, dtype=dtype)
+        return np.minimum(val, np.asarray(self.limit, dtype=dtype))
         
     @staticmethod
     def linear(factor: float):
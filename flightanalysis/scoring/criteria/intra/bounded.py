@@ -1,7 +1,7 @@
 from __future__ import annotations
 import numpy as np
 import numpy.typing as npt
-from .. import Criteria
+from .. import Criteria, ragged
 from dataclasses import dataclass
 from typing import Union
 from flightanalysis.scoring import Measurement, Result
@@ -20,14 +20,49 @@ class Bounded(Criteria):
         '''each downgrade corresponds to a group of values outside the bounds, ids
         correspond to the last velue in each case'''
         sample = self.prepare(m.value, m.expected)
-        ids = np.linspace(0, len(sample)-1, len(sample)).astype(int)
-        groups = np.concatenate([[0], np.diff(sample!=0).cumsum()])
+        starts, lengths = Bounded.groups(sample)
         
-        mistakes = np.array([np.mean(sample[groups==grp]) for grp in set(groups)])
-        dgids = np.array([ids[groups==grp][int(len(ids[groups==grp])/2)] for grp in set(groups)])
-        dgs = np.array([self.lookup(np.mean(sample[groups==grp])) * len(sample[groups==grp]) / len(sample) for grp in set(groups)])
+        flengths = lengths.astype(sample.dtype)
+        mistakes = np.add.reduceat(sample, starts) / flengths
+        dgids = starts + lengths // 2
+        dgs = self.lookup(mistakes) * flengths / len(sample)
         
         return Result(name, m, sample, mistakes[dgs>0], dgs[dgs>0] * m.visibility[dgids[dgs>0]], dgids[dgs>0])
+    
+    def batch(self, names: list[str], ms: list[Measurement]) -> list[Result]:
+        """Evaluate several measurements in one pass. Groups are split at the boundaries 
+        between measurements, so the Results match those of calling each one in turn."""
+        values, offsets = ragged([m.value for m in ms])
+        lens = np.diff(offsets)
+        sample = self.prepare(values, np.repeat([m.expected for m in ms], lens))
+
+        starts = np.union1d(Bounded.groups(sample)[0], offsets[:-1])
+        lengths = np.diff(np.append(starts, len(sample)))
+        mids = np.searchsorted(offsets, starts, side='right') - 1
+
+        flengths = lengths.astype(sample.dtype)
+        mistakes = np.add.reduceat(sample, starts) / flengths
+        dgids = starts + lengths // 2
+        dgs = self.lookup(mistakes) * flengths / lens[mids].astype(sample.dtype)
+        
+        keep = dgs > 0
+        splits = np.searchsorted(mids[keep], np.arange(1, len(ms)))
+        return [Result(
+            name, m, sample[o0:o1], mi, dg * m.visibility[ids - o0], ids - o0
+        ) for name, m, o0, o1, mi, dg, ids in zip(
+            names, ms, offsets[:-1], offsets[1:],
+            np.split(mistakes[keep], splits), np.split(dgs[keep], splits), np.split(dgids[keep], splits)
+        )]
+
+    @staticmethod
+    def groups(sample: npt.NDArray) -> tuple[npt.NDArray, npt.NDArray]:
+        """run length encode the sample into groups of zero and non zero values
+
+        Returns:
+            tuple[npt.NDArray, npt.NDArray]: the start index and length of each group
+        """
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(sample!=0)) + 1])
+        return starts, np.diff(np.append(starts, len(sample)))
         
     
     def visiblity(self, measurement, ids):
@@ -1,8 +1,7 @@
 from __future__ import annotations
 import numpy as np
 import numpy.typing as npt
-import pandas as pd
-from .. import Criteria
+from .. import Criteria, ragged
 from dataclasses import dataclass
 from flightanalysis.scoring import Measurement, Result
 
@@ -13,19 +12,28 @@ class Continuous(Criteria):
     only downgrades for increases (away from zero) of the value.
     treats each separate increase (peak - trough) as a new error.
     """
+    @staticmethod
+    def get_peak_trough_locs(arr) -> tuple[npt.NDArray, npt.NDArray]:
+        """Find the peaks and troughs of abs(arr) in a single pass. A peak is the last point 
+        of an increase, a trough is the first. The first point can only be a trough and the 
+        last point can only be a peak.
+
+        Returns:
+            tuple[npt.NDArray, npt.NDArray]: boolean masks of the peaks and troughs
+        """
+        increasing = np.diff(np.abs(arr)) > 0
+        turns = increasing[:-1] != increasing[1:]
+        peaks = np.concatenate([[False], turns & increasing[:-1], increasing[-1:]])
+        troughs = np.concatenate([increasing[:1], turns & increasing[1:], [False]])
+        return peaks, troughs
+
     @staticmethod
     def get_peak_locs(arr, rev=False):
-        increasing = np.sign(np.diff(np.abs(arr)))>0
-        last_downgrade = np.column_stack([increasing[:-1], increasing[1:]])
-        peaks = np.sum(last_downgrade.astype(int) * [10,1], axis=1) == (1 if rev else 10)
-        last_val = False if rev else increasing[-1]
-        first_val = increasing[0] if rev else False
-        return np.concatenate([np.array([first_val]), peaks, np.array([last_val])])
+        return Continuous.get_peak_trough_locs(arr)[1 if rev else 0]
 
     def __call__(self, name: str, m: Measurement) -> Result:
         sample = self.prepare(m.value, m.expected)
-        peak_locs = Continuous.get_peak_locs(sample)
-        trough_locs = Continuous.get_peak_locs(sample, True)
+        peak_locs, trough_locs = Continuous.get_peak_trough_locs(sample)
         mistakes = self.__class__.mistakes(sample, peak_locs, trough_locs)
         dgids = self.__class__.dgids(
             np.linspace(0, len(sample)-1, len(sample)).astype(int), 
@@ -35,9 +43,57 @@ class Continuous(Criteria):
         return Result(name, m, sample, mistakes, self.lookup(mistakes) * self.visibility(m, dgids), dgids)
         
     
+    def batch(self, names: list[str], ms: list[Measurement]) -> list[Result]:
+        """Evaluate several measurements in one pass over the concatenated samples. Peaks 
+        and troughs are not allowed to span the boundaries between measurements, so the 
+        Results match those of calling each one in turn."""
+        sample, offsets = ragged([self.prepare(m.value, m.expected) for m in ms])
+        first = np.zeros(len(sample), dtype=bool)
+        first[offsets[:-1]] = True
+        last = np.zeros(len(sample), dtype=bool)
+        last[offsets[1:] - 1] = True
+
+        increasing = np.diff(np.abs(sample)) > 0
+        inc_prev = np.concatenate([[False], increasing])
+        inc_next = np.concatenate([increasing, [False]])
+        single = first & last  # a single sample has no peaks or troughs
+        peak_locs = np.where(last, inc_prev, inc_prev & ~inc_next & ~first) & ~single
+        trough_locs = np.where(first, inc_next, ~inc_prev & inc_next & ~last) & ~single
+
+        mistakes = self.__class__.ragged_mistakes(sample, peak_locs, trough_locs, first)
+        dgids = self.__class__.dgids(np.arange(len(sample)), peak_locs, trough_locs)
+        mids = np.searchsorted(offsets, dgids, side='right') - 1
+
+        prev = np.concatenate([[0], dgids[:-1]])
+        new_measurement = np.diff(mids, prepend=-1) != 0
+        prev[new_measurement] = offsets[mids[new_measurement]]
+        # the running sum covers the whole batch, so it is accumulated in float64 to avoid 
+        # the error growing along it when the measurements are float32
+        csum = np.insert(np.cumsum(np.concatenate([m.visibility for m in ms]), dtype=np.float64), 0, 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            vis = ((csum[dgids] - csum[prev]) / (dgids - prev)).astype(sample.dtype)
+        dgs = self.lookup(mistakes) * vis
+
+        splits = np.searchsorted(mids, np.arange(1, len(ms)))
+        return [Result(
+            name, m, sample[o0:o1], mi, dg, ids - o0
+        ) for name, m, o0, o1, mi, dg, ids in zip(
+            names, ms, offsets[:-1], offsets[1:],
+            np.split(mistakes, splits), np.split(dgs, splits), np.split(dgids, splits)
+        )]
+
+    @classmethod
+    def ragged_mistakes(cls, data, peaks, troughs, first):
+        """mistakes for concatenated samples, first marks the start of each sample"""
+        return cls.mistakes(data, peaks, troughs)
+
     def visibility(self, measurement, ids):
-        rids = np.concatenate([[0], ids])
-        return np.array([np.mean(measurement.visibility[a:b]) for a, b in zip(rids[:-1], rids[1:])])
+        """The mean visibility between each downgrade id and the previous one, the samples
+        after the last id are not needed"""
+        rids = np.concatenate([[0], ids]).astype(int)
+        csum = np.insert(np.cumsum(measurement.visibility[:rids.max()]), 0, 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (csum[rids[1:]] - csum[rids[:-1]]) / np.diff(rids).astype(csum.dtype)
         
 
 class ContAbs(Continuous):
@@ -54,27 +110,41 @@ class ContAbs(Continuous):
         return ids[peaks]
 
 
+@dataclass
 class ContRat(Continuous):
+    """window is the width of the moving average applied to the values before looking for
+    peaks and troughs. Samples no more than two longer than the window are replaced by their mean.
+    """
+    window: int = 20
+
+    @staticmethod
+    def fill_nan(data: npt.NDArray) -> npt.NDArray:
+        """Forward fill nan values, then backward fill any at the start"""
+        valid = ~np.isnan(data)
+        if valid.all() or not valid.any():
+            return data
+        filled = data[np.maximum.accumulate(np.where(valid, np.arange(len(data)), 0))]
+        first = np.argmax(valid)
+        filled[:first] = data[first]
+        return filled
 
     @staticmethod
     def convolve(data, width):
-        kernel = np.ones(width) / width
-        l = len(data)
-        outd = np.full(l, np.nan)
-        conv = np.convolve(data, kernel, mode='valid')
+        """Moving average of width points, the ends are padded with the nearest average"""
+        kernel = np.ones(width, dtype=np.asarray(data).dtype) / width
+        conv = ContRat.fill_nan(np.convolve(data, kernel, mode='valid'))
         ld = (len(data) - len(conv))/2
-        outd[int(np.ceil(ld)):-int(np.floor(ld))] = conv
-        return pd.Series(outd).ffill().bfill().to_numpy()
+        return np.pad(conv, (int(np.ceil(ld)), int(np.floor(ld))), mode='edge')
     
     def prepare(self, values: npt.NDArray, expected: float):
         endcut = 1
         sample = np.full(len(values), expected)
         sample[endcut:-endcut] = values[endcut:-endcut]
         sample = values
-        if len(sample) <= 22:
+        if len(sample) <= self.window + 2:
             return np.full(len(sample), abs(np.mean(sample)))
         else:
-            return np.abs(ContRat.convolve(sample, 20))
+            return np.abs(ContRat.convolve(sample, self.window))
         
     @staticmethod
     def mistakes(data, peaks, troughs):
@@ -82,6 +152,19 @@ class ContRat(Continuous):
         values = np.concatenate([[data[0]], data[peaks + troughs]])
         return np.maximum(values[:-1], values[1:]) / np.minimum(values[:-1], values[1:]) - 1
     
+    @staticmethod
+    def ragged_mistakes(data, peaks, troughs, first):
+        '''The ratios between consecutive turning points, starting from the first value 
+        of each sample'''
+        starts = np.flatnonzero(first)
+        turns = np.flatnonzero(peaks + troughs)
+        locs = np.concatenate([starts, turns])
+        is_start = np.concatenate([np.ones(len(starts), dtype=bool), np.zeros(len(turns), dtype=bool)])
+        order = np.lexsort((~is_start, locs))
+        values, is_start = data[locs[order]], is_start[order]
+        ratios = np.maximum(values[:-1], values[1:]) / np.minimum(values[:-1], values[1:]) - 1
+        return ratios[~is_start[1:]]
+
     @staticmethod
     def dgids(ids, peaks, troughs):
         return ids[peaks + troughs]
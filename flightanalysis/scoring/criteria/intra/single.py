@@ -3,7 +3,7 @@ import numpy as np
 from numpy._typing import NDArray
 import numpy.typing as npt
 from dataclasses import dataclass
-from .. import Criteria
+from .. import Criteria, ragged
 from geometry import Point
 from flightanalysis.scoring import Result, Results, Measurement
 from typing import Union
@@ -29,6 +29,30 @@ class Single(Criteria):
             self.lookup(sample[sample!=0]) * vis[sample!=0],
             ids[sample!=0]
         )
+
+    def batch(self, names: list[str], ms: list[Measurement]) -> list[Result]:
+        """Evaluate several measurements, preparing the values and looking up the downgrades
+        for all of them together."""
+        values, offsets = ragged([m.value for m in ms])
+        sample = self.prepare(values, np.repeat([m.expected for m in ms], np.diff(offsets)))
+        if self.id is None:
+            sel, ids = np.arange(len(sample)), np.concatenate([np.arange(len(m), dtype=float) for m in ms])
+            visibility = np.concatenate([m.visibility for m in ms])
+        else:
+            sel = (offsets[:-1] if self.id >= 0 else offsets[1:]) + self.id
+            ids, offsets = np.zeros(len(ms)), np.arange(len(ms) + 1)
+            # only the selected sample of each visibility is needed
+            visibility = np.concatenate([m.visibility[[self.id]] for m in ms])
+        sample = sample[sel]
+        dgs = self.lookup(sample) * visibility
+        
+        results = []
+        for name, m, o0, o1 in zip(names, ms, offsets[:-1], offsets[1:]):
+            nz = sample[o0:o1] != 0
+            results.append(Result(
+                name, m, sample[o0:o1], sample[o0:o1][nz], dgs[o0:o1][nz], ids[o0:o1][nz]
+            ))
+        return results
         
 
 class SingRat(Single):    
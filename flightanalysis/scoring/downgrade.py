@@ -1,18 +1,52 @@
+from __future__ import annotations
 
 from flightdata import Collection, State
 from .criteria import Criteria
-from .measurement import Measurement
+from .measurement import Measurement, Kinematics
 from .results import Results, Result
 from typing import Callable, Union
-from geometry import Coord
-from dataclasses import dataclass
+from geometry import Coord, Point
+from dataclasses import dataclass, field
 import numpy as np
-import pandas as pd
 
-from scipy.signal import butter, filtfilt
 
 
 
+@dataclass
+class Measure:
+    """A named Measurement constructor with some of its arguments fixed, such as the 
+    projection vector of a loop. Unlike a closure it can be serialised.
+        name (str): the name of the resulting downgrade
+        method (str): the name of the Measurement staticmethod to call
+        kwargs (dict): the fixed keyword arguments
+    """
+    name: str
+    method: str
+    kwargs: dict = field(default_factory=dict)
+
+    @property
+    def __name__(self):
+        return self.name
+
+    def __call__(self, fl: State, tp: State, kin: Kinematics=None) -> Measurement:
+        return getattr(Measurement, self.method)(fl, tp, **self.kwargs, kin=kin)
+
+    def to_dict(self):
+        return dict(
+            name=self.name,
+            method=self.method,
+            kwargs={k: v.to_dict() if isinstance(v, Point) else v for k, v in self.kwargs.items()}
+        )
+
+    @staticmethod
+    def from_dict(data: dict) -> Measure:
+        return Measure(
+            data['name'],
+            data['method'],
+            {k: Point.from_dict(v) if isinstance(v, dict) else v for k, v in data['kwargs'].items()}
+        )
+
+
 @dataclass
 class DownGrade:
     """This is for Intra scoring, it sits within an El and defines how errors should be measured and the criteria to apply
@@ -23,17 +57,27 @@ class DownGrade:
     criteria: Criteria
 
     def to_dict(self):
-        return dict(
+        data = dict(
             measure=self.measure.__name__,
             criteria=self.criteria.to_dict()
         )
+        if isinstance(self.measure, Measure):
+            data['plan'] = self.measure.to_dict()
+        return data
+
+    @staticmethod
+    def from_dict(data: dict) -> DownGrade:
+        return DownGrade(
+            Measure.from_dict(data['plan']) if 'plan' in data else getattr(Measurement, data['measure']),
+            Criteria.from_dict(data['criteria'])
+        )
 
     @property
     def name(self):
         return self.measure.__name__
     
-    def __call__(self, fl, tp) -> Result:
-        return self.criteria(self.measure.__name__, self.measure(fl, tp))
+    def __call__(self, fl, tp, kin: Kinematics=None) -> Result:
+        return self.criteria(self.measure.__name__, self.measure(fl, tp, kin=kin))
         
 
 
@@ -41,6 +85,62 @@ class DownGrades(Collection):
     VType = DownGrade
     uid = "name"
 
+    @staticmethod
+    def from_dict(data: dict) -> DownGrades:
+        return DownGrades([DownGrade.from_dict(dg) for dg in data.values()])
+
     def apply(self, el, fl, tp) -> Results:
-        return Results(el.uid, [dg(fl, tp) for dg in self])
-       
\ No newline at end of file
+        kin = Kinematics(fl, tp)
+        return Results(el.uid, [dg(fl, tp, kin) for dg in self])
+       
+
+class BatchScorer:
+    """Scores the downgrades of many elements together. The measurements are made for each
+    element as they are added, evaluate then calls each criteria once with all of the 
+    measurements that use it and splits the Results back into a Results for each element.
+
+    The measurements are made in float64 and then stored and evaluated in dtype. Passing
+    np.float32 halves the size of the arrays handled by the criteria. The total intra 
+    downgrade of a manoeuvre then agrees with float64 to within 2e-4 (2e-5 relative), which
+    is well inside the 0.01 resolution that scores are reported to. Perfectly flat 
+    measurements (such as from synthetic data) can find different peaks and troughs.
+    """
+    def __init__(self, dtype=np.float64):
+        self.dtype = dtype
+        self.uids: list[str] = []
+        self.measurements: list[tuple[int, str, Criteria, Measurement]] = []
+
+    def add(self, uid: str, dgs: DownGrades, fl: State, tp: State):
+        """Measure each downgrade for an element"""
+        kin = Kinematics(fl, tp)
+        self.add_measurements(uid, [(dg.name, dg.criteria, dg.measure(fl, tp, kin=kin)) for dg in dgs])
+
+    def add_measurements(self, uid: str, measurements: list[tuple[str, Criteria, Measurement]]):
+        """Add an element whose measurements have already been made, as (name, criteria, measurement)"""
+        self.uids.append(uid)
+        for name, criteria, m in measurements:
+            self.measurements.append((len(self.uids) - 1, name, criteria, m.astype(self.dtype)))
+
+    def evaluate(self) -> list[Results]:
+        """Evaluate the measurements, returning a Results for each element in the order they were added"""
+        groups: list[tuple[Criteria, list[int]]] = []
+        for i, (_, _, criteria, _) in enumerate(self.measurements):
+            for gcriteria, members in groups:
+                if gcriteria == criteria:
+                    members.append(i)
+                    break
+            else:
+                groups.append((criteria, [i]))
+
+        results = [None] * len(self.measurements)
+        for criteria, members in groups:
+            for i, res in zip(members, criteria.batch(
+                [self.measurements[i][1] for i in members], 
+                [self.measurements[i][3] for i in members]
+            )):
+                results[i] = res
+
+        ers = [Results(uid) for uid in self.uids]
+        for (eli, *_), res in zip(self.measurements, results):
+            ers[eli].add(res)
+        return ers
@@ -4,7 +4,67 @@ from geometry import Point, Quaternion, PX, PY, PZ, P0, Transformation
 import numpy as np
 import numpy.typing as npt
 from dataclasses import dataclass
-from typing import Union, Any, Self
+from typing import Union, Any, Self, Callable
+from functools import cached_property
+
+
+class Visibility:
+    """Visibility factors that are only calculated when they are needed. Indexing calculates 
+    just the requested samples, unless the full array has already been made. The full array
+    is made (and kept) when the Visibility is used as an array.
+    """
+    def __init__(self, fun: Callable[[Any], npt.NDArray], n: int):
+        """
+        Args:
+            fun (Callable): returns the visibility for an index (slice, index array or mask) 
+            n (int): the number of samples
+        """
+        self.fun = fun
+        self.n = n
+        self._values: npt.NDArray = None
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def values(self) -> npt.NDArray:
+        if self._values is None:
+            self._values = self.fun(slice(None))
+        return self._values
+
+    def __array__(self, dtype=None, copy=None):
+        return self.values if dtype is None else self.values.astype(dtype)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __getitem__(self, ids):
+        if self._values is not None:
+            return self._values[ids]
+        if isinstance(ids, slice) and ids == slice(None):
+            return self.values
+        if np.isscalar(ids):
+            return self.fun(np.array([ids]))[0]
+        ids = ids if isinstance(ids, slice) else np.asarray(ids)
+        if Visibility._selects_nothing(ids, self.n):
+            # the geometry cannot be evaluated for no samples
+            return np.empty(0)
+        return self.fun(ids)
+
+    @staticmethod
+    def _selects_nothing(ids: slice | npt.NDArray, n: int) -> bool:
+        if isinstance(ids, slice):
+            return len(range(*ids.indices(n))) == 0
+        return not np.any(ids) if ids.dtype == bool else ids.size == 0
+
+    def astype(self, dtype, copy=True) -> Visibility:
+        if np.dtype(dtype) == np.float64:
+            return self
+        return Visibility(lambda ids: self[ids].astype(dtype), self.n)
+
+    def __reduce__(self):
+        # the calculation refers to the flight data so store the values instead
+        return (np.array, (self.values,))
 
 
 
@@ -13,7 +73,7 @@ class Measurement:
     value: npt.NDArray
     expected: float
     direction: Point
-    visibility: npt.NDArray
+    visibility: npt.NDArray | Visibility
 
     def __len__(self):
         return len(self.value)
@@ -34,6 +94,17 @@ class Measurement:
             visibility = list(self.visibility)
         )
     
+    def astype(self, dtype) -> Measurement:
+        """The Measurement with its value, expected and visibility in dtype, the direction 
+        is not used by the criteria so it is left as it is"""
+        return Measurement(
+            np.asarray(self.value).astype(dtype, copy=False),
+            np.dtype(dtype).type(self.expected),
+            self.direction,
+            self.visibility.astype(dtype) if isinstance(self.visibility, Visibility) 
+                else np.asarray(self.visibility).astype(dtype, copy=False)
+        )
+
     def exit_only(self):
         fac = np.zeros(len(self.value))
         fac[-1] = 1
@@ -57,72 +128,84 @@ class Measurement:
         return abs(Point.vector_rejection(loc, PY())) / abs(loc)
 
     @staticmethod
-    def _vector_vis(direction: Point, loc: Point) -> Union[Point, npt.NDArray]:
+    def _vector_vis(direction: Point, loc: Point, pos_vis: npt.NDArray=None) -> Union[Point, npt.NDArray]:
         #a vector error is more visible if it is perpendicular to the viewing vector
         # 0 to np.pi, pi/2 gives max, 0&np.pi give min
-        return direction,  (1 - 0.8* np.abs(Point.cos_angle_between(loc, direction))) * Measurement._pos_vis(loc)
+        pos_vis = Measurement._pos_vis(loc) if pos_vis is None else pos_vis
+        return direction,  (1 - 0.8* np.abs(Point.cos_angle_between(loc, direction))) * pos_vis
 
     @staticmethod
-    def _roll_vis(loc: Point, att: Quaternion) -> Union[Point, npt.NDArray]:
+    def _roll_vis(loc: Point, att: Quaternion, pos_vis: npt.NDArray=None) -> Union[Point, npt.NDArray]:
         #a roll error is more visible if the movement of the wing tips is perpendicular to the view vector
         #the wing tips move in the local body Z axis
+        pos_vis = Measurement._pos_vis(loc) if pos_vis is None else pos_vis
         world_tip_movement_direction = att.transform_point(PZ()) 
-        return world_tip_movement_direction, (1-0.8*np.abs(Point.cos_angle_between(loc, world_tip_movement_direction))) * Measurement._pos_vis(loc)
+        return world_tip_movement_direction, (1-0.8*np.abs(Point.cos_angle_between(loc, world_tip_movement_direction))) * pos_vis
 
     @staticmethod
-    def _rad_vis(loc:Point, axial_dir: Point) -> Union[Point, npt.NDArray]:
+    def _rad_vis(loc:Point, axial_dir: Point, pos_vis: npt.NDArray=None) -> Union[Point, npt.NDArray]:
         #radial error more visible if axis is parallel to the view vector
-        return axial_dir, (0.2+0.8*np.abs(Point.cos_angle_between(loc, axial_dir))) * Measurement._pos_vis(loc)
+        pos_vis = Measurement._pos_vis(loc) if pos_vis is None else pos_vis
+        return axial_dir, (0.2+0.8*np.abs(Point.cos_angle_between(loc, axial_dir))) * pos_vis
 
     
     @staticmethod
-    def speed(fl: State, tp: State, direction: Point=None, axis='body') -> Self:
+    def _lazy_vector_vis(direction: Point, loc: Point, pos_vis: Visibility) -> tuple[Point, Visibility]:
+        """The direction and the _vector_vis visibility, calculated when it is needed"""
+        return direction, Visibility(
+            lambda ids: Measurement._vector_vis(direction[ids], loc[ids], pos_vis[ids])[1], len(loc)
+        )
+
+    @staticmethod
+    def speed(fl: State, tp: State, direction: Point=None, axis='body', *, kin: Kinematics=None) -> Self:
+        kin = Kinematics(fl, tp) if kin is None else kin
         direction=Point(1,1,1) if direction is None else direction
-        def get_body_direction(st: State):
-            if axis == 'body':
-                return direction
-            else:
-                world_direction = tp[0].transform.rotate(direction) if axis == 'ref_frame' else direction
-                return st.att.inverse().transform_point(world_direction)
-        body_direction = get_body_direction(fl)
-        value = Point.scalar_projection(fl.vel, body_direction)
+        if axis == 'body':
+            fl_direction = tp_direction = direction
+        else:
+            world_direction = kin.ref_frame.rotate(direction) if axis == 'ref_frame' else direction
+            fl_direction = kin.fl_att_inv.transform_point(world_direction)
+            tp_direction = kin.tp_att_inv.transform_point(world_direction)
+        value = Point.scalar_projection(fl.vel, fl_direction)
         
         return Measurement(
             value, 
-            np.mean(Point.scalar_projection(tp.vel, get_body_direction(tp))),
-            *Measurement._vector_vis(
+            np.mean(Point.scalar_projection(tp.vel, tp_direction)),
+            *Measurement._lazy_vector_vis(
                 fl.att.transform_point(direction).unit(), 
-                fl.pos
+                fl.pos,
+                kin.pos_vis
             )
         )
 
     @staticmethod
-    def roll_angle(fl: State, tp: State) -> Self:
+    def roll_angle(fl: State, tp: State, *, kin: Kinematics=None) -> Self:
         """direction is the body X axis, value is equal to the roll angle difference from template"""
+        kin = Kinematics(fl, tp) if kin is None else kin
         body_roll_error = Quaternion.body_axis_rates(tp.att, fl.att) * PX()
         world_roll_error = fl.att.transform_point(body_roll_error)
 
         return Measurement(
             np.unwrap(abs(world_roll_error) * np.sign(body_roll_error.x)), 
             0, 
-            *Measurement._roll_vis(fl.pos, fl.att)
+            *kin.roll_vis
         )
 
     @staticmethod
-    def roll_angle_proj(fl: State, tp: State, proj: Point) -> Self:
+    def roll_angle_proj(fl: State, tp: State, proj: Point, *, kin: Kinematics=None) -> Self:
         """Direction is the body X axis, value is equal to the roll angle error.
         roll angle error is the angle between the body proj vector axis and the 
         reference frame proj vector. 
         proj normal of the plane to measure roll angles against.
 
         """
-        trfl = fl#.to_track() # flown in the track axis
+        kin = Kinematics(fl, tp) if kin is None else kin
         
-        rfproj=tp[0].att.transform_point(proj) # proj vector in the ref_frame
+        rfproj=kin.tp0.att.transform_point(proj) # proj vector in the ref_frame
         
-        tr_rf_proj = trfl.att.inverse().transform_point(rfproj) # proj vector in track axis
+        tr_rf_proj = kin.fl_att_inv.transform_point(rfproj) # proj vector in track axis
         
-        tp_rf_proj = tp.att.inverse().transform_point(rfproj) # proj vector in template body axis (body == track for template)
+        tp_rf_proj = kin.tp_att_inv.transform_point(rfproj) # proj vector in template body axis (body == track for template)
         
         with np.errstate(invalid='ignore'):
             fl_roll_angle = np.arcsin(Point.cross(tr_rf_proj, proj).x)
@@ -133,38 +216,40 @@ class Measurement:
         return Measurement(
             fl_roll_angle - tp_roll_angle,
             0, 
-            *Measurement._roll_vis(fl.pos, fl.att)
+            *kin.roll_vis
         )
 
     @staticmethod
-    def roll_angle_y(fl: State, tp: State) -> Self:
-        return Measurement.roll_angle_proj(fl, tp, PY())
+    def roll_angle_y(fl: State, tp: State, *, kin: Kinematics=None) -> Self:
+        return Measurement.roll_angle_proj(fl, tp, PY(), kin=kin)
 
     @staticmethod
-    def roll_angle_z(fl: State, tp: State) -> Self:
-        return Measurement.roll_angle_proj(fl, tp, PZ())
+    def roll_angle_z(fl: State, tp: State, *, kin: Kinematics=None) -> Self:
+        return Measurement.roll_angle_proj(fl, tp, PZ(), kin=kin)
 
     @staticmethod
-    def length(fl: State, tp: State, direction: Point=None) -> Self:
+    def length(fl: State, tp: State, direction: Point=None, *, kin: Kinematics=None) -> Self:
         '''Distance from the ref frame origin in the prescribed direction'''
-        ref_frame = tp[0].transform
-        distance = ref_frame.q.inverse().transform_point(fl.pos - ref_frame.pos) # distance in the ref_frame
+        kin = Kinematics(fl, tp) if kin is None else kin
+        ref_frame = kin.ref_frame
+        distance = kin.ref_frame_inv.transform_point(fl.pos - ref_frame.pos) # distance in the ref_frame
         
         v = distance if direction is None else Point.vector_projection(distance, direction)
 
         return Measurement(
             Point.scalar_projection(v, direction), 0,
-            *Measurement._vector_vis(ref_frame.q.transform_point(distance), fl.pos)
+            *Measurement._lazy_vector_vis(ref_frame.q.transform_point(distance), fl.pos, kin.pos_vis)
         )
             
     @staticmethod
-    def roll_rate(fl: State, tp: State) -> Measurement:
+    def roll_rate(fl: State, tp: State, *, kin: Kinematics=None) -> Measurement:
         """vector in the body X axis, length is equal to the roll rate"""
+        kin = Kinematics(fl, tp) if kin is None else kin
         wrvel = fl.att.transform_point(fl.p * PX())
-        return Measurement(abs(wrvel) * np.sign(fl.p), np.mean(tp.p), *Measurement._roll_vis(fl.pos, fl.att))
+        return Measurement(abs(wrvel) * np.sign(fl.p), np.mean(tp.p), *kin.roll_vis)
     
     @staticmethod
-    def track_proj(fl: State, tp: State, proj: Point, fix='ang'):
+    def track_proj(fl: State, tp: State, proj: Point, fix='ang', *, kin: Kinematics=None):
         """
         Direction is the world frame scalar rejection of the velocity difference onto the template velocity 
         vector.
@@ -172,13 +257,13 @@ class Measurement:
         if fix=='vel' we are only interested in velocity errors in the proj vector. (loop axial track)
         if fix=='ang' we are only interested in angle errors about the proj vector. (loop exit track)
         """
-        ref_frame = tp[0].transform
-        tr = ref_frame.q.inverse()
+        kin = Kinematics(fl, tp) if kin is None else kin
+        tr = kin.ref_frame_inv
 
-        fwvel = fl.att.transform_point(fl.vel)
-        twvel = tp.att.transform_point(tp.vel)
+        fwvel = kin.fl_wvel
+        twvel = kin.tp_wvel
 
-        direction, vis = Measurement._vector_vis(Point.vector_rejection(fwvel, twvel).unit(), fl.pos)
+        direction, vis = Measurement._lazy_vector_vis(Point.vector_rejection(fwvel, twvel).unit(), fl.pos, kin.pos_vis)
         
         fcvel = tr.transform_point(fwvel)
         tcvel = tr.transform_point(twvel)
@@ -199,36 +284,96 @@ class Measurement:
         return Measurement(angles, 0, direction, vis)
 
     @staticmethod
-    def track_y(fl: State, tp:State) -> Measurement:
+    def track_y(fl: State, tp:State, *, kin: Kinematics=None) -> Measurement:
         """angle error in the velocity vector about the template Z axis"""
-        return Measurement.track_proj(fl, tp, PZ())
+        return Measurement.track_proj(fl, tp, PZ(), kin=kin)
 
     @staticmethod
-    def track_z(fl: State, tp: State) -> Measurement:
-        return Measurement.track_proj(fl, tp, PY())
+    def track_z(fl: State, tp: State, *, kin: Kinematics=None) -> Measurement:
+        return Measurement.track_proj(fl, tp, PY(), kin=kin)
 
     @staticmethod
-    def radius(fl:State, tp:State, proj: Point) -> Measurement:
+    def radius(fl:State, tp:State, proj: Point, *, kin: Kinematics=None) -> Measurement:
         """
         Error in radius as a vector in the radial direction
         proj is the ref_frame(tp[0]) axial direction
         """
-        wproj = tp[0].att.transform_point(proj)
+        kin = Kinematics(fl, tp) if kin is None else kin
+        wproj = kin.tp0.att.transform_point(proj)
         
-        trfl = fl.to_track()
+        trfl = kin.track
         
-        trproj = trfl.att.inverse().transform_point(wproj)
+        trproj = kin.track_att_inv.transform_point(wproj)
         
-        normal_acc = trfl.zero_g_acc() * Point(0,1,1)
+        normal_acc = kin.track_zero_g_acc * Point(0,1,1)
         
         with np.errstate(invalid='ignore'):
             r = trfl.u**2 / abs(Point.vector_rejection(normal_acc, trproj))
             
 #        r = np.minimum(r, 400)
+        axial_dir = kin.tp0.att.transform_point(wproj)
+        pos, pos_vis = fl.pos, kin.pos_vis
         return Measurement(
-            r, np.mean(r), 
-            *Measurement._rad_vis(
-                fl.pos, 
-                tp[0].att.transform_point(wproj)
-            )  
-        )
\ No newline at end of file
+            r, np.mean(r), axial_dir,
+            Visibility(lambda ids: Measurement._rad_vis(pos[ids], axial_dir, pos_vis[ids])[1], len(pos))
+        )
+
+
+class Kinematics:
+    """Quantities derived from a flown element and its template that are used by more than 
+    one measurement. Each is calculated the first time it is needed and then shared by all 
+    the measurements made on the element.
+    """
+    def __init__(self, fl: State, tp: State):
+        self.fl = fl
+        self.tp = tp
+
+    @cached_property
+    def tp0(self) -> State:
+        return self.tp[0]
+
+    @cached_property
+    def ref_frame(self) -> Transformation:
+        return self.tp0.transform
+
+    @cached_property
+    def ref_frame_inv(self) -> Quaternion:
+        return self.ref_frame.q.inverse()
+
+    @cached_property
+    def fl_att_inv(self) -> Quaternion:
+        return self.fl.att.inverse()
+
+    @cached_property
+    def tp_att_inv(self) -> Quaternion:
+        return self.tp.att.inverse()
+
+    @cached_property
+    def fl_wvel(self) -> Point:
+        return self.fl.att.transform_point(self.fl.vel)
+
+    @cached_property
+    def tp_wvel(self) -> Point:
+        return self.tp.att.transform_point(self.tp.vel)
+
+    @cached_property
+    def track(self) -> State:
+        return self.fl.to_track()
+
+    @cached_property
+    def track_att_inv(self) -> Quaternion:
+        return self.track.att.inverse()
+
+    @cached_property
+    def track_zero_g_acc(self) -> Point:
+        return self.track.zero_g_acc()
+
+    @cached_property
+    def pos_vis(self) -> Visibility:
+        pos = self.fl.pos
+        return Visibility(lambda ids: Measurement._pos_vis(pos[ids]), len(pos))
+
+    @cached_property
+    def roll_vis(self) -> tuple[Point, Visibility]:
+        """The _roll_vis direction and visibility, the wing tips move in the body Z axis"""
+        return Measurement._lazy_vector_vis(self.fl.att.transform_point(PZ()), self.fl.pos, self.pos_vis)
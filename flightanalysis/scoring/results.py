@@ -105,6 +105,12 @@ class Results(Collection):
     def total(self):
         return sum([cr.total for cr in self])
 
+    def replace(self, result: Result) -> float:
+        """Replace the Result with the same name, returning the change in the total"""
+        old = self.data[result.name].total if result.name in self.data else 0
+        self.data[result.name] = result
+        return result.total - old
+
     def downgrade_summary(self):
         return {r.name: r.dgs for r in self if len(r.dgs) > 0}
 
@@ -130,7 +136,7 @@ class Results(Collection):
     def from_dict(data) -> Results:
         return Results(
             data['name'],
-            [Result.from_dict(v) for v in data['data'].values()]
+            [Results.from_dict(v) if 'data' in v else Result.from_dict(v) for v in data['data'].values()]
         )
 
 
@@ -148,6 +154,10 @@ class ElementsResults(Collection):
     @property
     def downgrade_list(self):
         return [er.total for er in self]
+
+    def replace(self, element: str, result: Result) -> float:
+        """Replace a Result of an element, returning the change in the total"""
+        return self.data[element].replace(result)
     
     def downgrade_df(self):
         df = pd.concat([idg.downgrade_df().sum() for idg in self], axis=1).T
@@ -181,6 +191,11 @@ class ManoeuvreResults:
 
     def score(self):
         return max(0, 10 - sum([v for v in self.summary().values()]))
+
+    def replace(self, element: str | None, result: Result) -> float:
+        """Replace an intra Result of an element, or an inter Result if element is None. 
+        Returns the change in the total downgrade."""
+        return self.inter.replace(result) if element is None else self.intra.replace(element, result)
     
     def to_dict(self):
         return dict(
@@ -0,0 +1,71 @@
+from __future__ import annotations
+import numpy as np
+import numpy.typing as npt
+from flightdata import State
+
+
+class LazyTemplate:
+    """A template that keeps the element templates it is built from and only stacks the
+    columns that are requested. Columns, constructs (pos, att, vel, rvel, acc etc) and labels
+    are cached once created. Anything else is passed to the full State, which is built the
+    first time it is needed.
+
+    Only the stacking is deferred. Each element template starts from the end of the previous
+    one, so all of them are created (with every column) before the LazyTemplate is made. What
+    is saved is the concatenation and labelling of the full State, and the copy of every
+    column that goes with it, when only a few columns or constructs are used.
+    """
+    def __init__(self, sections: list[State], labels: dict[str, str] = None):
+        """
+        Args:
+            sections (list[State]): the element templates, each starting on the last row of the previous
+            labels (dict[str, str], optional): labels to apply to the whole template. Defaults to None.
+        """
+        self.sections = sections
+        self.labels = {} if labels is None else labels
+        self._columns: dict[str, npt.NDArray] = {}
+        self._constructs: dict[str, object] = {}
+        self._state: State = None
+
+    def __len__(self):
+        return sum(len(sec) for sec in self.sections) - len(self.sections) + 1
+
+    def column(self, name: str) -> npt.NDArray:
+        """Stack a single column, labels included, dropping the overlapping rows as State.stack does"""
+        if name not in self._columns:
+            if name in self.labels:
+                col = np.full(len(self), self.labels[name], dtype=object)
+            elif name == 't':
+                offsets = np.cumsum([0] + [sec.data.index[-1] - sec.data.index[0] for sec in self.sections[:-1]])
+                col = np.concatenate([
+                    np.array(sec.data.index[:-1] if i < len(self.sections) - 1 else sec.data.index) - sec.data.index[0] + offset
+                    for i, (sec, offset) in enumerate(zip(self.sections, offsets))
+                ])
+            else:
+                col = np.concatenate(
+                    [sec.data[name].to_numpy()[:-1] for sec in self.sections[:-1]] +
+                    [self.sections[-1].data[name].to_numpy()]
+                )
+            self._columns[name] = col
+        return self._columns[name]
+
+    def to_state(self) -> State:
+        """The full State, as returned by State.stack(sections).label(**labels)"""
+        if self._state is None:
+            self._state = State.stack(self.sections).label(**self.labels)
+        return self._state
+
+    def __getattr__(self, name: str):
+        if name.startswith('_') or name in ('sections', 'labels'):
+            raise AttributeError(name)
+        if name in State.constructs.data:
+            if name not in self._constructs:
+                con = State.constructs.data[name]
+                self._constructs[name] = con.obj(np.column_stack([self.column(k) for k in con.keys]))
+            return self._constructs[name]
+        if name in self.labels or name in self.sections[0].data.columns:
+            return self.column(name)
+        return getattr(self.to_state(), name)
+
+    def __getitem__(self, sli):
+        return self.to_state()[sli]
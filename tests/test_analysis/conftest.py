@@ -0,0 +1,29 @@
+from pytest import fixture
+import numpy as np
+import geometry as g
+from flightdata import State
+from flightanalysis import SchedDef, ManoeuvreAnalysis
+from flightanalysis.analysis import MeasurementStore
+
+
+@fixture(scope="session")
+def ma():
+    mdef = SchedDef.load('f3a_p25')[0]
+    man, tp = mdef.create_template(mdef.info.initial_transform(170, 1))
+    rng = np.random.default_rng(0)
+    fl = tp.remove_labels()
+    fl = State.from_constructs(
+        fl.time, 
+        fl.pos + g.Point(rng.normal(0, 0.3, (len(fl), 3))), 
+        fl.att, 
+        fl.vel * 1.05 + g.Point(rng.normal(0, 0.2, (len(fl), 3))), 
+        fl.rvel
+    )
+    return ManoeuvreAnalysis.build(mdef, fl)
+
+
+@fixture(scope="session")
+def store(ma, tmp_path_factory):
+    file = tmp_path_factory.mktemp("store") / "flight"
+    MeasurementStore.build([ma]).save(file)
+    return MeasurementStore.load(file)
@@ -0,0 +1,59 @@
+from pytest import approx, fixture
+import numpy as np
+import pandas as pd
+from flightanalysis.analysis import Calibration, sensitivity
+from flightanalysis.analysis.store import with_criteria, criteria_paths
+from flightanalysis.scoring.criteria.f3a_criteria import F3A
+from flightanalysis.scoring import ContAbs, Exponential
+
+
+@fixture(scope="session")
+def calibration(store):
+    return Calibration.build({'f0': store, 'f1': store})
+
+
+def test_downgrades(ma, store, calibration):
+    scores = store.rescore()[ma.uid]
+    np.testing.assert_allclose(calibration.downgrades().to_numpy(), sum(scores.summary().values()), rtol=1e-9)
+
+
+def test_grid():
+    grid = Calibration.grid(Exponential(2, 1, 10), 5)
+    assert grid.shape == (25, 3)
+    np.testing.assert_allclose(grid[12], [2, 1, 10])
+
+
+def test_fit(ma, store, calibration):
+    track = F3A.intra.track.lookup
+    F3A2 = with_criteria(F3A, {'intra.track': ContAbs(Exponential(track.factor * 2, track.exponent, track.limit))})
+    reference = pd.DataFrame({ma.uid: [store.rescore(F3A2)[ma.uid].score()] * 2}, index=['f0', 'f1'])
+
+    grid = np.column_stack([track.factor * np.array([0.5, 1, 1.5, 2, 2.5]), np.full(5, track.exponent), np.full(5, track.limit)])
+    cset, stats = calibration.fit(reference, {'intra.track': grid}, rounds=1)
+
+    assert criteria_paths(cset)['intra.track'].lookup.factor == approx(track.factor * 2)
+    assert stats.rmse.iloc[-1] == approx(0, abs=1e-6)
+    assert stats.rmse.iloc[0] > 0
+
+
+def test_sensitivity(calibration):
+    sens = calibration.sensitivity()
+    for path, lookup in calibration.lookups().items():
+        h = np.abs(lookup[0]) * 1e-6 + 1e-9
+        steps = lookup + np.diag(h)
+        fd = (calibration.samples[path].downgrades(steps, len(calibration.index)) - 
+              calibration.samples[path].downgrades(lookup, len(calibration.index))) / h[:, None]
+        np.testing.assert_allclose(sens[path].to_numpy().T, -fd, rtol=1e-4, atol=1e-6)
+    assert sens[('intra.track', 'factor')].iloc[0] < 0
+
+
+def test_sensitivity_flights(store, calibration, tmp_path):
+    files = [store.save(tmp_path / 'f0'), store.save(tmp_path / 'f1')]
+    sens = sensitivity(files, workers=2)
+    uid = calibration.index[0][1]
+    assert list(sens.index) == [('f0', uid), ('f0', 'total'), ('f1', uid), ('f1', 'total')]
+    np.testing.assert_allclose(sens.loc[('f0', 'total')], calibration.sensitivity().loc['f0'].sum())
+    rel = sensitivity(files, relative=True, workers=1)
+    assert rel.loc[('f1', 'total'), ('intra.track', 'factor')] == approx(
+        sens.loc[('f1', 'total'), ('intra.track', 'factor')] * F3A.intra.track.lookup.factor
+    )
@@ -0,0 +1,57 @@
+from pytest import approx
+import numpy as np
+from flightanalysis.analysis.store import MeasurementStore, criteria_key, criteria_diff, patch_flights
+from flightanalysis.scoring.criteria.f3a_criteria import F3A
+from flightanalysis.scoring import ContAbs, Exponential
+
+
+def test_criteria_key():
+    assert criteria_key(F3A.intra.roll) == 'intra.roll'
+    assert criteria_key(ContAbs(Exponential(1, 1))) is None
+
+
+def test_rescore(ma, store):
+    scores = ma.scores()
+    rescores = store.rescore()[ma.uid]
+    assert rescores.intra.downgrade_list == approx(scores.intra.downgrade_list, abs=1e-12)
+    assert rescores.inter.total == approx(scores.inter.total)
+    assert rescores.positioning.total == approx(scores.positioning.total)
+
+
+class Intra(F3A.intra):
+    track = ContAbs(Exponential(F3A.intra.track.lookup.factor * 2, F3A.intra.track.lookup.exponent, 20))
+
+
+class F3A2(F3A):
+    intra = Intra
+
+
+def test_criteria_diff():
+    assert list(criteria_diff(F3A, F3A2).keys()) == ['intra.track']
+    assert criteria_diff(F3A, F3A) == {}
+
+
+def test_rescore_new_criteria(ma, store):
+    old, new = store.rescore()[ma.uid], store.rescore(F3A2)[ma.uid]
+    for er_old, er_new in zip(old.intra, new.intra):
+        for r_old, r_new in zip(er_old, er_new):
+            np.testing.assert_array_equal(r_old.errors, r_new.errors)
+            if not r_old.name in ['track_y', 'track_z']:
+                np.testing.assert_array_equal(r_old.dgs, r_new.dgs)
+    assert new.intra.total > old.intra.total
+    assert new.inter.total == old.inter.total
+
+
+def test_patch(ma, store):
+    results = store.rescore()
+    old_total = results[ma.uid].intra.total
+    deltas = store.patch(results, criteria_diff(F3A, F3A2))
+    expected = store.rescore(F3A2)[ma.uid]
+    assert results[ma.uid].intra.downgrade_list == approx(expected.intra.downgrade_list)
+    assert deltas[ma.uid] == approx(expected.intra.total - old_total)
+
+
+def test_patch_flights(ma, store):
+    df = patch_flights({'f0': (store, store.rescore()), 'f1': (store, store.rescore())}, F3A, F3A2)
+    assert list(df.index) == ['f0', 'f1']
+    assert df.loc['f0', ma.uid] == approx(store.rescore(F3A2)[ma.uid].score() - store.rescore()[ma.uid].score())
@@ -1,4 +1,4 @@
-from pytest import fixture, mark
+from pytest import fixture, mark, approx
 from flightanalysis.scoring.criteria import *
 from flightanalysis.scoring import Measurement
 from numpy.testing import assert_array_almost_equal
@@ -67,6 +67,36 @@ def test_continuous_call_absolute(contabs):
     assert_array_almost_equal(res.dgs, [0.1,0.2])
 
 
+def test_contrat_convolve():
+    data = np.concatenate([np.ones(5), np.full(5, 2.0)])
+    res = ContRat.convolve(data, 4)
+    np.testing.assert_array_almost_equal(res, [1, 1, 1, 1, 1.25, 1.5, 1.75, 2, 2, 2])
+
+
+def test_contrat_convolve_nan():
+    data = np.array([np.nan, 1, 1, 1, np.nan, 1, 1, 1])
+    np.testing.assert_array_equal(ContRat.convolve(data, 3), np.ones(8))
+
+
+def test_contrat_window():
+    short = ContRat(Exponential(1,1), window=4).prepare(np.arange(6.0), 0)
+    np.testing.assert_array_equal(short, np.full(6, 2.5))
+    long = ContRat(Exponential(1,1), window=4).prepare(np.arange(7.0), 0)
+    np.testing.assert_array_almost_equal(long, [1.5, 1.5, 1.5, 2.5, 3.5, 4.5, 4.5])
+    assert Criteria.from_dict(ContRat(Exponential(1,1), window=4).to_dict()).window == 4
+
+
+def test_continuous_peak_trough_locs():
+    peaks, troughs = Continuous.get_peak_trough_locs(np.array([0.1, 0.2, 0, -0.1, -0.2, -0.1]))
+    np.testing.assert_array_equal(peaks, [False, True, False, False, True, False])
+    np.testing.assert_array_equal(troughs, [True, False, True, False, False, False])
+
+
+def test_continuous_visibility(contabs):
+    m = Measurement(np.zeros(6), 0, g.PX(6), np.array([1, 2, 3, 4, 5, 6]))
+    np.testing.assert_array_almost_equal(contabs.visibility(m, np.array([2, 5])), [1.5, 4])
+
+
 def test_combination_from_dict(combination):
     res = Criteria.from_dict(combination.to_dict())
     assert res == combination
@@ -112,6 +142,20 @@ def test_bounded_call(maxbound: MaxBound):
     np.testing.assert_array_equal(res.errors, [1, 1])
     np.testing.assert_array_equal(res.dgs, [0.25, 0.25])
 
+def test_bounded_groups():
+    testarr = np.concatenate([np.zeros(2), np.ones(3), np.zeros(1), np.full(4, 2)])
+    starts, lengths = Bounded.groups(testarr)
+    np.testing.assert_array_equal(starts, [0, 2, 5, 6])
+    np.testing.assert_array_equal(lengths, [2, 3, 1, 4])
+
+
+def test_bounded_call_noisy(maxbound: MaxBound):
+    testarr = np.tile([0, 1, 2, 0, 0], 20).astype(float)
+    res = maxbound('test', Measurement(testarr, 0, g.PX(100), np.ones(100)))
+    np.testing.assert_array_equal(res.keys, np.arange(20) * 5 + 2)
+    np.testing.assert_array_equal(res.errors, np.full(20, 1.5))
+    np.testing.assert_array_equal(res.dgs, np.full(20, 0.03))
+
 def test_maxbound_serialise(maxbound: MaxBound):
     data = maxbound.to_dict()
     mb2 = Criteria.from_dict(data)
@@ -154,3 +198,66 @@ def test_outside_below(outside: OutsideBound):
     sample = outside.prepare(np.full(11, -2), 0)
     np.testing.assert_array_equal(sample, np.zeros(11))
     
+
+
+@mark.parametrize('criteria', [
+    MaxBound(Exponential(1,1), 0.5),
+    InsideBound(Exponential(1,1), [-1, 1]),
+    ContAbs(Exponential(1,1)),
+    ContRat(Exponential(1,1), window=5),
+    Single(Exponential(1,1)),
+    Single(Exponential(1,1), id=None),
+])
+def test_batch(criteria):
+    rng = np.random.default_rng(1)
+    ms = [
+        Measurement(v, 1, g.PX(len(v)), rng.uniform(0, 1, len(v)))
+        for v in [rng.normal(0, 1, n) + 3 for n in [5, 1, 40, 2, 3, 1, 100, 2]]
+    ]
+    names = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+    for res, batch_res in zip([criteria(n, m) for n, m in zip(names, ms)], criteria.batch(names, ms)):
+        assert res.name == batch_res.name
+        np.testing.assert_array_equal(res.keys, batch_res.keys)
+        np.testing.assert_array_almost_equal(res.errors, batch_res.errors)
+        np.testing.assert_array_almost_equal(res.dgs, batch_res.dgs)
+
+
+@mark.parametrize('criteria', [
+    ContAbs(Exponential(3.8, 1, 10)),
+    ContRat(Exponential(0.5, 1.29, 2)),
+    Single(Exponential(3.8, 1, 10)),
+    MaxBound(Exponential(1, 1, 10), 0.5),
+])
+def test_batch_float32(criteria):
+    rng = np.random.default_rng(1)
+    ms = [
+        Measurement(v, 1, g.PX(len(v)), rng.uniform(0, 1, len(v)))
+        for v in [rng.normal(0, 1, n) + 3 for n in [5, 40, 100]]
+    ]
+    names = ['a', 'b', 'c']
+    for res, res32 in zip(criteria.batch(names, ms), criteria.batch(names, [m.astype(np.float32) for m in ms])):
+        assert res32.dgs.dtype == np.float32
+        assert res32.total == approx(res.total, rel=1e-5, abs=1e-4)
+
+
+@mark.parametrize('criteria', [
+    ContAbs(Exponential(3.8, 1, 10)),
+    ContRat(Exponential(0.5, 1.29, 2)),
+])
+def test_batch_float32_large(criteria):
+    """a batch the size of a whole schedule, so the errors could build up along it"""
+    rng = np.random.default_rng(2)
+    ms = [
+        Measurement(v, 1, g.PX(len(v)), rng.uniform(0.5, 1, len(v)))
+        for v in [np.cumsum(rng.normal(0, 0.05, n)) + 3 for n in rng.integers(100, 600, 150)]
+    ]
+    names = [f'm{i}' for i in range(len(ms))]
+    for res, res32 in zip(criteria.batch(names, ms), criteria.batch(names, [m.astype(np.float32) for m in ms])):
+        assert res32.total == approx(res.total, rel=2e-5, abs=2e-4)
+
+
+def test_exponential_dtypes():
+    lookup = Exponential(np.array([1.0, 2.0]), np.array([1.0, 2.0]), 10)
+    np.testing.assert_array_equal(lookup(np.array([3.0, 3.0])), [3.0, 10.0])
+    assert Exponential(0.5, 1.5)(np.ones(3, dtype=np.float32)).dtype == np.float32
+    assert Exponential(0.5, 1.5)(4) == 4.0
@@ -0,0 +1,68 @@
+from pytest import fixture, approx
+import pickle
+import numpy as np
+from flightanalysis.definition import *
+from flightanalysis.scoring import Combination
+from flightanalysis.scoring.criteria.f3a_criteria import F3A
+from flightanalysis.elements import Line, Elements
+
+
+@fixture
+def mps():
+    return ManParms([
+        ManParm("loop_radius", F3A.inter.radius, 55.0),
+        ManParm("line_length", F3A.inter.length, 130.0),
+        ManParm("speed", F3A.inter.speed, 30.0),
+        ManParm("rolls", Combination.rolllist([np.pi, -np.pi / 2]), 0),
+    ])
+
+
+@fixture
+def mpo(mps):
+    return 0.5 * (mps.line_length - abs(mps.rolls[0]) * mps.loop_radius / mps.speed) - mps.rolls[1]
+
+
+def test_compile(mps, mpo):
+    compiled = mpo.compile()
+    assert compiled(mps) == mpo(mps)
+    assert str(compiled) == str(mpo)
+    assert mpo.compile() is compiled
+    assert list(compiled.slots) == ["line_length", "rolls[0]", "loop_radius", "speed", "rolls[1]"]
+
+
+def test_compile_parsed(mps, mpo):
+    assert ManParm.parse(str(mpo), mps).compile()(mps) == mpo(mps)
+
+
+def test_compile_evaluate(mps, mpo):
+    res = mpo.compile().evaluate(dict(
+        line_length=np.array([130.0, 150.0]),
+        loop_radius=55.0,
+        speed=np.array([30.0, 20.0]),
+        rolls=np.array([[np.pi, -np.pi / 2], [-np.pi, np.pi / 2]]),
+    ))
+    assert res[0] == approx(mpo(mps))
+    assert res[1] == approx(0.5 * (150 - np.pi * 55 / 20) - np.pi / 2)
+
+
+def test_compile_collectors():
+    els = Elements([Line(30, 30, 0, "e1"), Line(30, 10, 0, "e2")])
+    coll = Collector("e1", "length") - 2 * Collector("e2", "length")
+    assert coll.compile()(els) == coll(els) == 10
+    assert coll.compile().evaluate({"e1.length": np.array([30, 40]), "e2.length": 10}).tolist() == [10, 20]
+
+
+def test_compiled_pickle(mps, mpo):
+    compiled = pickle.loads(pickle.dumps(mpo.compile()))
+    assert compiled(mps) == mpo(mps)
+
+
+def test_mandef_pickle_after_create():
+    md = SchedDef.load('f3a_p25')[0]
+    itrans = md.info.initial_transform(170, 1)
+    man, tp = md.create_template(itrans)
+    md2 = pickle.loads(pickle.dumps(md))
+    assert md2.to_dict() == md.to_dict()
+    man2, tp2 = md2.create_template(itrans)
+    assert man2.to_dict() == man.to_dict()
+    np.testing.assert_array_almost_equal(tp2.pos.data, tp.pos.data)
@@ -0,0 +1,110 @@
+from pytest import fixture
+from flightanalysis.definition import *
+from flightanalysis.definition.library import TemplateLibrary, definition_hash
+from flightanalysis.definition.eldef import TemplateCache
+from flightdata import State
+import numpy as np
+from geometry import PX
+
+
+@fixture(scope="session")
+def vline():
+    return ManDef.from_dict(f3amb.create(ManInfo("Vertical Line", "vline", 2,
+            Position.CENTRE,
+            BoxLocation(Height.BTM, Direction.UPWIND, Orientation.UPRIGHT),
+            BoxLocation(Height.BTM)
+        ),
+        [
+            f3amb.loop(-np.pi/2),
+            f3amb.roll("1/2"),
+            f3amb.loop(np.pi/2),
+        ]
+    ).to_dict())
+
+
+@fixture(scope="session")
+def library(vline, tmp_path_factory):
+    file = tmp_path_factory.mktemp("library") / "vline_templates"
+    TemplateLibrary.build([vline]).save(file)
+    return TemplateLibrary.load(file)
+
+
+def test_build_entry_velocities():
+    stall = ManDef.from_dict(f3amb.create(ManInfo("Stall Turn", "stall", 3,
+            Position.END,
+            BoxLocation(Height.MID, Direction.UPWIND, Orientation.UPRIGHT),
+            BoxLocation(Height.BTM)
+        ),
+        [
+            f3amb.loop(np.pi/2),
+            f3amb.line(length=50),
+            f3amb.stallturn(),
+            f3amb.roll("1/2", line_length=180),
+            f3amb.loop(-np.pi/2),
+        ]
+    ).to_dict())
+    vels = {can['element']: can['vel'] for can in TemplateLibrary.build([stall]).index['manoeuvres']['stall']['canonical']}
+    np.testing.assert_allclose(vels['e_0'], [30, 0, 0])
+    np.testing.assert_allclose(vels['e_2'], [30, 0, 0], atol=1e-6)
+    np.testing.assert_allclose(vels['e_3_pad1'], [0, 0, 0], atol=1e-6)
+
+
+def test_load_missing(tmp_path):
+    assert TemplateLibrary.load(tmp_path / "missing") is None
+
+
+def test_apply(vline, library):
+    mdef = ManDef.from_dict(vline.to_dict())
+    assert library.apply([mdef]) == ["vline"]
+
+    origin = mdef._origins[mdef._summary_key()]
+    np.testing.assert_array_equal(origin.pos.data, vline.origin_template().pos.data)
+    assert list(origin.element) == list(vline.origin_template().element)
+
+    el = mdef.eds.e_0(mdef.mps)
+    assert len(el._canonical) == 1
+
+
+def test_apply_deferred(vline, library):
+    mdef = ManDef.from_dict(vline.to_dict())
+    library.apply([mdef])
+    cache = mdef.eds.e_0(mdef.mps)._canonical
+    key = next(iter(cache))
+    assert isinstance(dict.__getitem__(cache, key), TemplateCache.Deferred)
+    assert key in cache
+    assert isinstance(cache[key], State)
+    assert isinstance(dict.__getitem__(cache, key), State)
+
+
+def test_apply_invalidated(vline, library):
+    mdef = ManDef.from_dict(vline.to_dict())
+    mdef.mps.loop_radius.default = 60
+    assert not definition_hash(mdef) == definition_hash(vline)
+    assert library.apply([mdef]) == []
+    assert len(mdef._origins) == 0
+
+
+def test_create_template(vline):
+    itrans = vline.info.initial_transform(170, 1)
+    man, template = vline.create_template(itrans)
+    direct = man.create_template(itrans)
+    np.testing.assert_allclose(template.pos.data, direct.pos.data, atol=1e-6)
+    assert list(template.element) == list(direct.element)
+
+
+def test_concatenate(vline, library):
+    data = vline.to_dict()
+    data['info']['short_name'] = 'vline2'
+    data['mps']['loop_radius']['default'] = 60
+    vline2 = ManDef.from_dict(data)
+    joined = TemplateLibrary.concatenate([library, TemplateLibrary.build([vline2])])
+    assert list(joined.index['manoeuvres'].keys()) == ['vline', 'vline2']
+
+    mdefs = [ManDef.from_dict(vline.to_dict()), ManDef.from_dict(data)]
+    assert joined.apply(mdefs) == ['vline', 'vline2']
+    origin = mdefs[1]._origins[mdefs[1]._summary_key()]
+    np.testing.assert_array_equal(origin.pos.data, vline2.origin_template().pos.data)
+    el = mdefs[1].eds.e_0(mdefs[1].mps)
+    (key, canonical), = el._canonical.items()
+    direct = vline2.eds.e_0(vline2.mps).canonical_template(PX(key[1][0]))
+    np.testing.assert_array_equal(canonical.pos.data, direct.pos.data)
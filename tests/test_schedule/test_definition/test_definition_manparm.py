@@ -3,6 +3,8 @@ from flightanalysis.definition import *
 from flightanalysis.scoring import *
 from flightanalysis.scoring.criteria.f3a_criteria import F3A
 from flightanalysis.elements import *
+from flightdata import State
+from geometry import Transformation, PX
 from pytest import fixture, approx
 import numpy as np
  
@@ -37,8 +39,37 @@ def test_mp_get_downgrades(mp, els):
     assert res.total == approx(0.64201464)
 
 
+@fixture
+def tp(els):
+    istate = State.from_transform(Transformation(), vel=PX(30))
+    templates = []
+    for el in els:
+        templates.append(el.create_template(istate))
+        istate = templates[-1][-1]
+    return State.stack(templates)
+
+
+def test_mp_collect_vis_cache(mp, els, tp):
+    cache = {}
+    direction, vis = mp.collect_vis(els, tp, cache)
+    assert set(cache.keys()) == {'e1', 'e2', ('e1', 'length'), ('e2', 'length')}
+    for i, c in enumerate(mp.collectors):
+        d, v = c.visibility(els, tp)
+        np.testing.assert_array_almost_equal(direction[i].data, d.data)
+        assert vis[i] == approx(v[0])
+    cached = cache[('e1', 'length')]
+    mp.collect_vis(els, tp, cache)
+    assert cache[('e1', 'length')] is cached
+
+
 def test_serialization(mp):
     mpd = mp.to_dict()
 
     mp2 = ManParm.from_dict(mpd)
-    assert isinstance(mp2.criteria.lookup, Exponential)
\ No newline at end of file
+    assert isinstance(mp2.criteria.lookup, Exponential)
+
+def test_mp_with_default(mp):
+    assert mp.with_default(20) is mp
+    mp2 = mp.with_default(25)
+    assert mp2.default == 25 and mp.default == 20
+    assert mp2.collectors is mp.collectors
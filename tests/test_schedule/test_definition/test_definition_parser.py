@@ -0,0 +1,73 @@
+from pytest import fixture, raises
+import numpy as np
+from flightanalysis.definition import *
+from flightanalysis.definition.operations.parser import parse_tree, tokenize
+from flightanalysis.scoring import Combination
+from flightanalysis.scoring.criteria.f3a_criteria import F3A
+
+
+@fixture
+def mps():
+    return ManParms([
+        ManParm("loop_radius", F3A.inter.radius, 55.0),
+        ManParm("line_length", F3A.inter.length, 130.0),
+        ManParm("rolls", Combination.rolllist([np.pi, -np.pi / 2]), 0),
+    ])
+
+
+def test_tokenize():
+    assert tokenize("(e_1.length+1e-05)") == [
+        ("sym", "("), ("name", "e_1.length"), ("sym", "+"), ("num", "1e-05"), ("sym", ")")
+    ]
+
+
+def test_parse_tree():
+    assert parse_tree("(0.5*abs(rolls[1]))") == (
+        "math", "*", ("num", 0.5), ("fun", "abs", ("item", ("name", "rolls"), 1))
+    )
+    assert parse_tree("-3.5") == ("num", -3.5)
+    assert parse_tree("(1, 2)") == ("literal", "(1, 2)")
+
+
+def test_parse_roundtrip(mps):
+    mpo = (mps.loop_radius * mps.line_length) - abs(mps.rolls[0] + (mps.line_length / 2.0))
+    mpo2 = ManParm.parse(str(mpo), mps)
+    assert str(mpo2) == str(mpo)
+    assert mpo2(mps) == mpo(mps)
+    assert mpo2.a.a is mps.loop_radius
+
+
+def test_parse_memo(mps):
+    mpo = ManParm.parse("(line_length-loop_radius)", mps)
+    assert ManParm.parse("(line_length-loop_radius)", mps) is mpo
+    assert ManParm.parse("(line_length-loop_radius)", mps, "named") is not mpo
+    assert ManParm.parse("(line_length-loop_radius)", mps.copy()) is not mpo
+
+
+def test_parse_literals(mps):
+    assert ManParm.parse("30", mps) == 30.0
+    assert ManParm.parse("(1, 2)", mps) == (1, 2)
+    with raises(KeyError):
+        ManParm.parse("(line_length-speed)", mps)
+
+
+def test_parse_collector():
+    coll = Collector.parse("(e_1.length+(2.0*e_2.length))", "total")
+    assert str(coll) == "(e_1.length+(2.0*e_2.length))"
+    assert coll.name == coll.b.name == "total"
+    assert coll.b.b.elname == "e_2"
+
+
+def test_parse_memo_replaced_leaf(mps):
+    mpo = ManParm.parse("(line_length-loop_radius)", mps)
+    mps.add(ManParm("loop_radius", F3A.inter.radius, 40.0))
+    mpo2 = ManParm.parse("(line_length-loop_radius)", mps)
+    assert mpo2 is not mpo
+    assert mpo2.b is mps.loop_radius
+    assert mpo2(mps) == 90.0
+    assert ManParm.parse("(line_length-loop_radius)", mps) is mpo2
+
+
+def test_opp_subclasses_use_parser(mps):
+    assert MathOpp.parse is Opp.parse and ItemOpp.parse_f is Opp.parse_f
+    assert str(MathOpp.parse("abs(rolls[1])", mps)) == "abs(rolls[1])"
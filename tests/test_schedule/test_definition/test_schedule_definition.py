@@ -1,4 +1,4 @@
-from pytest import fixture
+from pytest import fixture, approx
 
 from flightanalysis.definition import *
 from flightanalysis.elements import *
@@ -66,3 +66,102 @@ def test_mdef_parse_dict(p23_def_dict):
     pass
 
 
+
+
+def test_template_summary_cached(vline):
+    summary = vline.template_summary()
+    assert vline.template_summary() is summary
+    assert vline.create(vline.info.initial_transform(170, -1)).entry_line.length > 0
+    assert vline.template_summary() is summary
+
+
+def test_template_summary_updates_with_defaults(vline):
+    mdef = ManDef.from_dict(vline.to_dict())
+    summary = mdef.template_summary()
+    mdef.mps.line_length.default = 200.0
+    assert mdef.template_summary() is not summary
+
+
+def test_eldef_dependencies(vline):
+    assert vline.eds.e_0.dependencies == {'loop_radius'}
+    assert list(vline.eds.dependents(['loop_radius']).data.keys()) == ['e_0', 'e_2']
+
+
+def test_recreate(vline, man):
+    mdef = ManDef.from_dict(vline.to_dict())
+    mdef.mps.loop_radius.default = 40.0
+    changed = mdef.mps.changed(vline.mps)
+    assert changed == ['loop_radius']
+    
+    man2 = mdef.recreate(man, changed, vline.info.initial_transform(170,1))
+    assert man2.elements.e_0.radius == 40.0
+    assert man2.elements.e_1_0 is man.elements.e_1_0
+    assert man2.elements.e_2 is not man.elements.e_2
+
+
+def test_variants(vline):
+    import pandas as pd
+    table = pd.DataFrame({'loop_radius': [40.0, 55.0, 70.0], 'line_length': [100.0, 130.0, 160.0]})
+    params = vline.variants(table)
+    assert list(params.keys()) == list(vline.eds.data.keys())
+    np.testing.assert_array_equal(params['e_0'].radius, table.loop_radius)
+    assert len(params['e_1_0']) == 3
+
+    mans = vline.create_variants(table)
+    mdef = ManDef.from_dict(vline.to_dict())
+    for i, man in enumerate(mans):
+        mdef.mps.loop_radius.default = table.loop_radius[i]
+        mdef.mps.line_length.default = table.line_length[i]
+        expected = mdef._create()
+        assert all(a == b for a, b in zip(man.elements, expected.elements))
+
+
+def test_scheddef_lazy():
+    sdef = SchedDef.load("f3a_p25")
+    assert sdef.data.built() == []
+    infos = sdef.infos
+    assert len(infos) == len(sdef)
+    assert sdef.data.built() == []
+    mdef = sdef[2]
+    assert mdef.info.to_dict() == infos[2].to_dict()
+    assert sdef.data.built() == [infos[2].short_name]
+    assert sdef[infos[2].short_name] is mdef
+    assert [md.uid for md in sdef] == [info.short_name for info in infos]
+
+
+def test_update_defaults_shared(vline, man):
+    assert vline.update_defaults(man) is vline
+    mdef = ManDef.from_dict(vline.to_dict())
+    mdef.mps.loop_radius.default = 40.0
+    cmdef = mdef.update_defaults(man)
+    assert cmdef.mps.loop_radius.default == approx(vline.mps.loop_radius.default)
+    assert cmdef.mps.line_length is mdef.mps.line_length
+    assert cmdef.eds is mdef.eds
+    assert man.copy_directions(man) is man
+
+
+def test_create_variants_share_templates(vline):
+    import pandas as pd
+    from geometry import PX
+    mdef = ManDef.from_dict(vline.to_dict())
+    mans = mdef.create_variants(pd.DataFrame({'loop_radius': [40.0, 40.0, 40.0]}))
+    templates = [man.elements.e_0.canonical_template(PX(30)) for man in mans]
+    assert templates[1] is templates[0] and templates[2] is templates[0]
+    assert len(mdef.eds.e_0._canonical) == 1
+    assert mdef.eds.e_0(mdef.mps)._canonical is mdef.eds.e_0._canonical
+
+
+def test_template_cache_maxsize():
+    from flightanalysis.definition.eldef import TemplateCache
+    cache = TemplateCache(2)
+    cache['a'], cache['b'] = 1, 2
+    assert cache['a'] == 1
+    cache['c'] = 3
+    assert list(cache.keys()) == ['a', 'c']
+
+
+def test_template_summary_updates_with_eldefs(vline):
+    mdef = ManDef.from_dict(vline.to_dict())
+    summary = mdef.template_summary()
+    mdef.eds.e_0.props['radius'] = 20.0
+    assert mdef.template_summary() is not summary
@@ -22,3 +22,53 @@ def test_set_parms():
 def test_create_time_basic():
     t = Element.create_time(10, None)
     assert len(t) == np.ceil(10 * State._construct_freq)
+
+
+def test_init_args():
+    assert SubEl.init_args() == ("speed", "arg1", "arg2", "uid")
+    se = SubEl(30, 2, 3, "e1")
+    assert repr(se) == "SubEl(e1, 30, 2, 3)"
+    assert se.copy().__dict__ == se.__dict__
+
+
+def test_from_name():
+    from flightanalysis.elements import Loop
+    assert Element.from_name("SubEl") is SubEl
+    assert Element.from_name("loop") is Loop
+    assert Element.from_name("notanelement") is None
+
+
+def test_set_parms_unchanged():
+    se = SubEl(30, 2, 3)
+    assert se.set_parms(arg1=2) is se
+    assert se.set_parms(arg1=4) is not se
+
+
+def test_resample_template_rolling_loop():
+    from flightanalysis.elements import Loop
+    from flightdata import Time
+    from geometry import Transformation, Point, Euler, PX
+    el = Loop(30, 50.0, 2 * np.pi, 2 * np.pi, 0, "e1")
+    istate = State.from_transform(Transformation(Point(0, 0, 100), Euler(np.pi, 0, 0)), vel=PX(30))
+    centre = el.create_template(istate, Time.from_t(np.linspace(0, el.duration, 5000))).pos.mean()
+
+    fine = Time.from_t(np.linspace(0, el.duration, int(el.duration * 120)))
+    np.testing.assert_allclose(
+        el.resample_template(istate, fine).pos.data, 
+        el.create_template(istate, fine).pos.data, 
+        atol=1e-2
+    )
+
+    coarse = Time.from_t(np.linspace(0, el.duration, int(el.duration * 5)))
+    resampled = el.resample_template(istate, coarse)
+    assert np.abs(abs(resampled.pos - centre) - 50).max() < 0.2
+    np.testing.assert_allclose(resampled.att.transform_point(PX(1)).data[-1], [1, 0, 0], atol=1e-6)
+
+
+def test_canonical_template_key():
+    from flightanalysis.elements import Line
+    from geometry import Point
+    el = Line(30, 100, 0, "e1")
+    tp = el.canonical_template(Point(30, 0, 0))
+    assert el.canonical_template(Point(30 + 1e-11, -1e-13, 0)) is tp
+    assert len(el._canonical) == 1
@@ -48,3 +48,16 @@ def test_match_intention():
     el3 = el2.match_intention(tp[0].transform, fl)
     assert el3 == el
 
+
+
+def test_resample_template():
+    el = Line(30, 100, np.pi, "test")
+    istate = State.from_transform(Transformation(Point(10, 170, 50), Euler(np.pi, 0, 0)), vel=PX(30))
+    time = State.from_transform(vel=PX(30)).extrapolate(2).time
+    
+    template = el.create_template(istate, time)
+    resampled = el.resample_template(istate, time)
+
+    np.testing.assert_array_almost_equal(resampled.pos.data, template.pos.data)
+    np.testing.assert_array_almost_equal(resampled.att.data, template.att.data)
+    assert len(el._canonical) == 1
@@ -130,6 +130,22 @@ def test_serialization(half_loop):
     assert half_loop == hl
 
 
+def test_intra_scoring_cached(half_loop):
+    plan = half_loop.intra_scoring
+    assert half_loop.intra_scoring is plan
+    assert half_loop.set_parms(radius=60).intra_scoring is not plan
+    half_loop.ke = np.pi / 2
+    assert half_loop.intra_scoring is not plan
+    assert_almost_equal(half_loop.intra_scoring.radius.measure.kwargs['proj'], PZ())
+
+
+def test_intra_scoring_serialization(half_loop):
+    from flightanalysis.scoring import DownGrades
+    plan = DownGrades.from_dict(json.loads(json.dumps(half_loop.intra_scoring.to_dict())))
+    assert plan.to_dict() == half_loop.intra_scoring.to_dict()
+    assert plan.track_y.measure == half_loop.intra_scoring.track_y.measure
+
+
 def test_create_template_new_time(half_loop: Loop):
     tp = half_loop.create_template(
         State.from_transform(Transformation(), vel=PX(30)), 
@@ -2,7 +2,8 @@
 
 
 from flightanalysis.elements import StallTurn
-from geometry import Transformation, Point
+from geometry import Transformation, Point, PX
+from flightdata import State, Time
 import numpy as np
 
 
@@ -19,3 +20,15 @@ def test_create_template():
         template[-1].att.transform_point(Point.X(1.0)).data
     )
 
+
+
+def test_resample_template_cached():
+    el = StallTurn(0, 3, "test")
+    istate = State.from_transform(Transformation(), vel=PX(30))
+    
+    for n in [20, 35, 50]:
+        time = Time.from_t(np.linspace(0, 1, n))
+        tp = el.resample_template(istate, time)
+        assert len(tp) == n
+        np.testing.assert_array_almost_equal(tp.att[-1].data, el.create_template(istate, time).att[-1].data)
+    assert len(el._canonical) == 1
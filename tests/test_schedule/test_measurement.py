@@ -1,7 +1,7 @@
 from flightdata import State
-from flightanalysis.scoring import Measurement
+from flightanalysis.scoring import Measurement, Kinematics, Visibility
 from geometry import Point, Quaternion, Transformation, PX, PY, PZ, Euldeg, P0, Q0
-from pytest import fixture, approx
+from pytest import fixture, approx, raises
 import numpy as np
 from flightanalysis import Loop
 
@@ -83,4 +83,55 @@ def test_length_above():
     meas = Measurement.length_above(fl, tp, tp[0].transform,
         PY(), 2)
     assert meas.value[-1]==approx(18)
-    assert meas.direction[-1].data == approx(-PX(20).data)
\ No newline at end of file
+    assert meas.direction[-1].data == approx(-PX(20).data)
+
+def test_kinematics_shared(loop_tp: State):
+    tp = loop_tp.move(Transformation(PY(100),Euldeg(0, 270, 0)))
+    fl = tp.superimpose_roll(np.radians(5))
+    kin = Kinematics(fl, tp)
+    for measure in [Measurement.track_y, Measurement.track_z, Measurement.roll_angle_y, Measurement.speed]:
+        m0 = measure(fl, tp)
+        m1 = measure(fl, tp, kin=kin)
+        np.testing.assert_array_equal(m0.value, m1.value)
+        np.testing.assert_array_equal(m0.visibility, m1.visibility)
+    assert 'pos_vis' in kin.__dict__
+    assert 'track' not in kin.__dict__
+
+
+def test_visibility_lazy(loop_tp: State):
+    tp = loop_tp.move(Transformation(PY(100),Euldeg(0, 270, 0)))
+    fl = tp.superimpose_roll(np.radians(5))
+    for measure in [Measurement.roll_angle_y, Measurement.speed, lambda fl, tp: Measurement.length(fl, tp, PY())]:
+        full = Measurement.from_dict(measure(fl, tp).to_dict()).visibility
+        m = measure(fl, tp)
+        assert isinstance(m.visibility, Visibility)
+        assert m.visibility[-1] == full[-1]
+        np.testing.assert_array_equal(m.visibility[[1, 5, 9]], full[[1, 5, 9]])
+        assert m.visibility._values is None
+        np.testing.assert_array_equal(np.asarray(m.visibility), full)
+        assert m.visibility._values is not None
+
+
+def test_visibility_lazy_empty(line_tp: State):
+    m = Measurement.length(line_tp, line_tp, PY())
+    assert isinstance(m.visibility, Visibility)
+    assert len(m.visibility[np.array([], dtype=int)]) == 0
+    assert len(m.visibility[np.zeros(len(m), dtype=bool)]) == 0
+    assert len(m.visibility[3:3]) == 0
+    assert m.visibility._values is None
+
+
+def test_bounded_no_downgrades(line_tp: State):
+    from flightanalysis.scoring.criteria.f3a_criteria import F3A
+    m = Measurement.length(line_tp, line_tp, PY())
+    assert F3A.intra.recovery_length('recovery', m).total == 0
+    res = F3A.intra.recovery_length.batch(['a', 'b'], [m, Measurement.length(line_tp, line_tp, PY())])
+    assert [r.total for r in res] == [0, 0]
+
+
+def test_kinematics_keyword_only(loop_tp: State):
+    kin = Kinematics(loop_tp, loop_tp)
+    with raises(TypeError):
+        Measurement.track_y(loop_tp, loop_tp, kin)
+    with raises(TypeError):
+        Measurement.length(loop_tp, loop_tp, PX(), kin)
@@ -1,3 +1,4 @@
+import numpy as np
 
 from flightanalysis import Manoeuvre, SchedDef
 from flightdata import State
@@ -22,3 +23,25 @@ def test_create_template(tophat: Manoeuvre, itrans):
     template = tophat.create_template(itrans)
 
     assert isinstance(template, State)
+
+
+def test_create_template_lazy(tophat: Manoeuvre, itrans):
+    template = tophat.create_template(itrans)
+    lazy = tophat.create_template(itrans, lazy=True)
+    assert len(lazy) == len(template)
+    np.testing.assert_array_equal(lazy.t, template.t)
+    np.testing.assert_array_equal(lazy.pos.data, template.pos.data)
+    np.testing.assert_array_equal(lazy.y, template.y)
+    assert list(lazy.element) == list(template.element)
+    assert list(lazy.manoeuvre) == list(template.manoeuvre)
+    assert lazy._state is None
+    assert lazy.to_state().data.equals(template.data)
+
+
+def test_create_template_resample(tophat: Manoeuvre, itrans):
+    template = tophat.create_template(itrans)
+    direct = tophat.create_template(itrans, template)
+    resampled = tophat.create_template(itrans, template, resample=True)
+    np.testing.assert_array_equal(direct.t, resampled.t)
+    assert abs(resampled.pos - direct.pos).max() < 1
+    assert not np.array_equal(resampled.pos.data, direct.pos.data)